@@ -4,6 +4,7 @@ import asyncio
 import os
 import sys
 import traceback
+from pathlib import Path
 
 import aiohttp
 import discord
@@ -11,7 +12,10 @@ from discord.ext import commands
 from discord.ext.commands import ExtensionFailed, ExtensionNotFound, NoEntryPointError
 
 from utils import locale_v2
+from utils.valorant.auth import ClientSession
 from utils.valorant.cache import get_cache
+from utils.valorant.local import LocaleCatalog
+from utils.valorant.storage import close_storage
 
 initial_extensions = ['cogs.admin', 'cogs.errors', 'cogs.notify', 'cogs.valorant']
 
@@ -57,7 +61,9 @@ class ValorantBot(commands.Bot):
 
     async def setup_hook(self) -> None:
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            # pooled keep-alive connections, shared by every Riot / valorant-api.com request
+            connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(connector=connector)
 
         try:
             self.owner_id = int(os.getenv('OWNER_ID'))  # type: ignore
@@ -65,7 +71,8 @@ class ValorantBot(commands.Bot):
             self.bot_app_info = await self.application_info()
             self.owner_id = self.bot_app_info.owner.id
 
-        self.setup_cache()
+        LocaleCatalog.load()
+        await self.setup_cache()
         await self.load_cogs()
         # await self.tree.sync()
 
@@ -81,17 +88,15 @@ class ValorantBot(commands.Bot):
                 print(f'Failed to load extension {ext}.', file=sys.stderr)
                 traceback.print_exc()
 
-    @staticmethod
-    def setup_cache() -> None:
-        try:
-            with open('data/cache.json', encoding='utf-8'):
-                ...
-        except FileNotFoundError:
-            get_cache()
+    async def setup_cache(self) -> None:
+        if not Path('data/cache.json').exists():
+            await get_cache(self.session)  # type: ignore[arg-type]
 
     async def close(self) -> None:
         if self.session:
             await self.session.close()
+        await ClientSession.close_shared()
+        close_storage()
         await super().close()
 
     async def start(self, debug: bool = False) -> None:  # type: ignore[override]
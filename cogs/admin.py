@@ -6,6 +6,8 @@ import discord
 from discord import Interaction, app_commands, ui
 from discord.ext import commands
 
+from utils.valorant.local import LocaleCatalog
+
 if TYPE_CHECKING:
     from bot import ValorantBot
 
@@ -47,6 +49,14 @@ class Admin(commands.Cog):
             await self.bot.tree.sync()
             await ctx.reply('Un-Synced global !')
 
+    @commands.command()
+    @commands.is_owner()
+    async def reload_locale(self, ctx: commands.Context[ValorantBot]) -> None:
+        """Reload the language files"""
+
+        count = LocaleCatalog.load()
+        await ctx.reply(f'Reloaded {count} languages !')
+
     @app_commands.command(description='Shows basic information about the bot.')
     async def about(self, interaction: Interaction) -> None:
         """Shows basic information about the bot."""
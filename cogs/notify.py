@@ -1,121 +1,464 @@
 from __future__ import annotations
 
-import functools
-import operator
+import asyncio
+import os
+import random
+import time as _time
 import traceback
-from datetime import datetime, time, timedelta
-from difflib import get_close_matches
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, time, timedelta
 from typing import TYPE_CHECKING, Any, Literal
 
 # Standard
 import discord
-from discord import Forbidden, HTTPException, Interaction, app_commands
+from discord import Forbidden, HTTPException, Interaction, NotFound, app_commands
 from discord.ext import commands, tasks
 
-from utils.errors import ValorantBotError
-from utils.locale_v2 import ValorantTranslator
+from utils.errors import DatabaseError, NotifyTargetError, ValorantBotError
+from utils.locale_v2 import ValorantTranslator, to_valorant_locale
 from utils.valorant import view as View
-from utils.valorant.cache import create_json
 from utils.valorant.db import DATABASE
 from utils.valorant.embed import Embed, GetEmbed
 from utils.valorant.endpoint import API_ENDPOINT
+from utils.valorant.http import HTTPClient, Priority, request_priority
 from utils.valorant.local import ResponseLanguage
-from utils.valorant.useful import JSON, GetEmoji, GetItems, format_relative
+from utils.valorant.search import PrefixIndex, SkinSearch
+from utils.valorant.useful import GetEmoji, GetItems, PriceTable
 
 VLR_locale = ValorantTranslator()
 
 if TYPE_CHECKING:
     from bot import ValorantBot
 
-
-class Notify(commands.Cog):
+# notify run limits
+NOTIFY_CONCURRENCY = int(os.getenv('NOTIFY_CONCURRENCY', '16'))  # users processed at the same time
+NOTIFY_SHARD_CONCURRENCY = int(os.getenv('NOTIFY_SHARD_CONCURRENCY', '8'))  # in-flight Riot requests per shard
+NOTIFY_CHANNEL_CONCURRENCY = int(os.getenv('NOTIFY_CHANNEL_CONCURRENCY', '1'))  # in-flight messages per channel
+NOTIFY_WINDOW = int(os.getenv('NOTIFY_WINDOW', '0'))  # seconds after the store reset a run is spread over
+NOTIFY_BATCH_WAIT = 60  # seconds a partial channel batch waits for more users before it is sent
+
+# failed notifications are retried with exponential backoff, then dead-lettered
+NOTIFY_MAX_ATTEMPTS = int(os.getenv('NOTIFY_MAX_ATTEMPTS', '5'))
+NOTIFY_RETRY_DELAY = 60  # seconds before the first retry, doubled after every attempt
+NOTIFY_RETRY_MAX_DELAY = 60 * 60
+NOTIFY_RETRY_INTERVAL = 30  # seconds between two drains of the retry queue
+
+# Discord message limits, a channel batch is split to fit them
+MESSAGE_EMBEDS = 10
+MESSAGE_EMBED_CHARS = 6000
+MESSAGE_CONTENT_CHARS = 2000
+MESSAGE_BUTTONS = 25
+
+# background token refresh
+TOKEN_REFRESH_INTERVAL = 5 * 60  # seconds between two checks, refreshes are spread over it
+TOKEN_REFRESH_LEAD = 20 * 60  # refresh tokens expiring within this many seconds
+TOKEN_REFRESH_NOTIFY_WINDOW = 30 * 60  # notify users are only refreshed this many seconds before the daily run
+
+
+@dataclass
+class NotifyStats:
+    """Progress of a notify run"""
+
+    run_id: str = ''
+    total: int = 0
+    processed: int = 0
+    failed: int = 0
+    messages: int = 0
+    started_at: float = field(default_factory=_time.monotonic)
+
+    def __str__(self) -> str:
+        elapsed = _time.monotonic() - self.started_at
+        rate = self.processed / elapsed if elapsed else 0.0
+        return (
+            f'{self.processed}/{self.total} users, {self.messages} messages, {self.failed} failed '
+            f'in {elapsed:.1f}s ({rate:.1f} users/s)'
+        )
+
+
+@dataclass
+class NotifyDelivery:
+    """Notification of one user waiting to be sent to its channel"""
+
+    user_id: str
+    mention: str
+    embeds: list[discord.Embed]
+    skins: list[tuple[str, str]] = field(default_factory=list)  # (uuid, name) of the skins with a remove button
+
+    @property
+    def embed_chars(self) -> int:
+        return sum(len(embed) for embed in self.embeds)
+
+
+def pack_deliveries(deliveries: list[NotifyDelivery]) -> list[list[NotifyDelivery]]:
+    """Pack the notifications of a channel into as few messages as the Discord limits allow"""
+
+    batches: list[list[NotifyDelivery]] = []
+    batch: list[NotifyDelivery] = []
+    embeds = chars = content = buttons = 0
+    for delivery in deliveries:
+        mention = len(delivery.mention) + 5  # ||mention|| and a space
+        if batch and (
+            embeds + len(delivery.embeds) > MESSAGE_EMBEDS
+            or chars + delivery.embed_chars > MESSAGE_EMBED_CHARS
+            or content + mention > MESSAGE_CONTENT_CHARS
+            or buttons + len(delivery.skins) > MESSAGE_BUTTONS
+        ):
+            batches.append(batch)
+            batch = []
+            embeds = chars = content = buttons = 0
+        batch.append(delivery)
+        embeds += len(delivery.embeds)
+        chars += delivery.embed_chars
+        content += mention
+        buttons += len(delivery.skins)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class Notify(commands.Cog):  # noqa: PLR0904
     def __init__(self, bot: ValorantBot) -> None:
         self.bot: ValorantBot = bot
-        self.endpoint: API_ENDPOINT | None = None
         self.db: DATABASE = None
+        self._shard_limits: dict[str, asyncio.Semaphore] = {}
+        self._channel_limits: dict[int, asyncio.Semaphore] = {}
+        self._channel_locales: dict[int, str] = {}  # channel id: preferred locale of its guild
+        self._pending: dict[int, list[NotifyDelivery]] = {}  # channel id: notifications not sent yet
+        self._notify_lock = asyncio.Lock()  # one notify run at a time
+        self._resume: asyncio.Task[None] | None = None
         self.notifys.start()
+        self.refresh_tokens.start()
+        self.retry_notifys.start()
 
     def cog_unload(self) -> None:
         self.notifys.cancel()
+        self.refresh_tokens.cancel()
+        self.retry_notifys.cancel()
+        if self._resume is not None:
+            self._resume.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         self.db = DATABASE()
-        self.endpoint = API_ENDPOINT()
+        for guild in self.bot.guilds:
+            self.index_guild(guild)
+
+        # resume the run of today if the bot restarted in the middle of it
+        journal = self.db.get_notify_run(self.notify_run_id())
+        resuming = self._resume is not None and not self._resume.done()
+        if any(status == 'pending' for status, _ in journal.values()) and not resuming:
+            print('Resuming the notify run of today...')
+            self._resume = asyncio.create_task(self.send_notify())
+
+    # ---------- CHANNEL LOCALE ---------- #
+
+    def index_guild(self, guild: discord.Guild) -> None:
+        """Map every channel of a guild to the guild locale"""
+        locale = str(guild.preferred_locale)
+        for channel in guild.channels:
+            self._channel_locales[channel.id] = locale
+
+    def unindex_guild(self, guild: discord.Guild) -> None:
+        """Forget the channels of a guild"""
+        for channel in guild.channels:
+            self._channel_locales.pop(channel.id, None)
+
+    def channel_locale(self, channel_id: int) -> str:
+        """Get the locale of the guild of a channel, en-US for DMs and unknown channels"""
+        return self._channel_locales.get(channel_id, 'en-US')
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild) -> None:
+        self.index_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self.unindex_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before: discord.Guild, after: discord.Guild) -> None:
+        if before.preferred_locale != after.preferred_locale:
+            self.index_guild(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel) -> None:
+        self._channel_locales[channel.id] = str(channel.guild.preferred_locale)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel) -> None:
+        self._channel_locales.pop(channel.id, None)
 
     async def get_endpoint_and_data(self, user_id: int) -> tuple[API_ENDPOINT, Any]:
-        data = await self.db.is_data(user_id, 'en-US')
-        endpoint = self.endpoint
-        endpoint.activate(data)
+        player = await self.db.get_session(user_id, 'en-US')
+        data = self.db.get_notify_settings(user_id)
+        endpoint = API_ENDPOINT(self.bot.session, player, refresh=self.db.refresh_session)  # type: ignore[arg-type]
         return endpoint, data
 
-    async def send_notify(self) -> None:
-        notify_users = self.db.get_user_is_notify()
-        notify_data = JSON.read('notifys')
+    def shard_limit(self, shard: str) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent Riot requests to a shard"""
+        if shard not in self._shard_limits:
+            self._shard_limits[shard] = asyncio.Semaphore(NOTIFY_SHARD_CONCURRENCY)
+        return self._shard_limits[shard]
+
+    def channel_limit(self, channel_id: int) -> asyncio.Semaphore:
+        """Get the semaphore limiting concurrent messages to a Discord channel (one rate limit route)"""
+        if channel_id not in self._channel_limits:
+            self._channel_limits[channel_id] = asyncio.Semaphore(NOTIFY_CHANNEL_CONCURRENCY)
+        return self._channel_limits[channel_id]
 
-        for user_id in notify_users:
+    async def notify_user(self, user_id: str, stats: NotifyStats) -> bool:
+        """Send the store notification of one user, returns False if there is nothing to send"""
+
+        # endpoint
+        endpoint, data = await self.get_endpoint_and_data(int(user_id))
+
+        # offer
+        async with self.shard_limit(endpoint.shard):
+            offer = await endpoint.store_fetch_storefront(section='SkinsPanelLayout')
+        skin_offer_list = offer['SkinsPanelLayout']['SingleItemOffers']
+        duration = offer['SkinsPanelLayout']['SingleItemOffersRemainingDurationInSeconds']
+
+        # author
+        author = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(int(user_id))
+        channel_send = author if data['dm_message'] else self.bot.get_channel(int(data['notify_channel']))
+        if channel_send is None:
+            raise NotifyTargetError(f'notify channel {data["notify_channel"]} not found')  # noqa: TRY003
+
+        # get guild language
+        guild_locale = self.channel_locale(channel_send.id)
+
+        response = ResponseLanguage('notify_send', guild_locale)
+
+        mention = author.mention
+        if data['notify_mode'] == 'Specified':
             try:
-                # endpoint
-                endpoint, data = await self.get_endpoint_and_data(int(user_id))
-
-                # offer
-                offer = endpoint.store_fetch_storefront()
-                skin_offer_list = offer['SkinsPanelLayout']['SingleItemOffers']
-                duration = offer['SkinsPanelLayout']['SingleItemOffersRemainingDurationInSeconds']
-
-                # author
-                author = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(int(user_id))
-                channel_send = author if data['dm_message'] else self.bot.get_channel(int(data['notify_channel']))
-
-                # get guild language
-                guild_locale = 'en-US'
-                get_guild_locale = [
-                    guild.preferred_locale for guild in self.bot.guilds if channel_send in guild.channels
+                skins = [
+                    (uuid, GetItems.get_skin(uuid)['names'][to_valorant_locale(guild_locale)])
+                    for uuid in self.db.get_notify_matches(user_id, skin_offer_list)
                 ]
-                if len(get_guild_locale) > 0:
-                    guild_locale = guild_locale[0]
-
-                response = ResponseLanguage('notify_send', guild_locale)
-
-                user_skin_list = [skin for skin in notify_data if skin['id'] == str(user_id)]  # type: ignore
-                user_skin_list_uuid = [skin['uuid'] for skin in notify_data if skin['id'] == str(user_id)]  # type: ignore
-
-                if data['notify_mode'] == 'Specified':
-                    skin_notify_list = list(set(skin_offer_list).intersection(set(user_skin_list_uuid)))
-                    for noti in user_skin_list:
-                        if noti['uuid'] in skin_notify_list:  # type: ignore
-                            uuid = noti['uuid']  # type: ignore
-                            skin = GetItems.get_skin(uuid)
-                            name = skin['names'][guild_locale]
-                            icon = skin['icon']
-                            emoji = GetEmoji.tier_by_bot(uuid, self.bot)
-
-                            notify_send: str = response.get('RESPONSE_SPECIFIED')  # type: ignore
-                            duration = format_relative(datetime.utcnow() + timedelta(seconds=duration))  # type: ignore
-
-                            embed = Embed(notify_send.format(emoji=emoji, name=name, duration=duration), color=0xFD4554)
-                            embed.set_thumbnail(url=icon)
-                            view = View.NotifyView(user_id, uuid, name, ResponseLanguage('notify_add', guild_locale))
-                            view.message = await channel_send.send(  # type: ignore
-                                content=f'||{author.mention}||', embed=embed, view=view
-                            )
-
-                elif data['notify_mode'] == 'All':
-                    embeds = GetEmbed.notify_all_send(endpoint.player, offer, response, self.bot)
-                    await channel_send.send(content=f'||{author.mention}||', embeds=embeds)  # type: ignore
-
-            except (KeyError, FileNotFoundError):
-                print(f'{user_id} is not in notify list')
-            except Forbidden:
-                print("Bot don't have perm send notification message.")
+            except ValorantBotError as e:  # skin missing from the cache
+                raise NotifyTargetError(str(e)) from e
+            if not skins:
+                return False
+            embeds = [GetEmbed.notify_specified_send(uuid, guild_locale, duration, self.bot) for uuid, _ in skins]
+            delivery = NotifyDelivery(user_id, mention, embeds, skins)
+
+        elif data['notify_mode'] == 'All':
+            await PriceTable.refresh(endpoint.store_fetch_offers)
+            embeds = GetEmbed.notify_all_send(endpoint.player, offer, response, self.bot)
+            delivery = NotifyDelivery(user_id, mention, embeds)
+
+        else:
+            return False
+
+        # a DM is never shared, a guild channel waits for a full message
+        await self.deliver(channel_send, guild_locale, delivery, stats, flush=data['dm_message'])
+        return True
+
+    # ---------- CHANNEL BATCH ---------- #
+
+    async def deliver(
+        self,
+        channel: discord.abc.Messageable,
+        locale: str,
+        delivery: NotifyDelivery,
+        stats: NotifyStats,
+        flush: bool = False,
+    ) -> None:
+        """Queue a notification for its channel, sending the messages the channel batch already fills"""
+
+        pending = self._pending.setdefault(channel.id, [])  # type: ignore[attr-defined]
+        pending.append(delivery)
+        batches = pack_deliveries(pending)
+        if not flush:
+            batches = batches[:-1]  # the last message may still grow
+        if not batches:
+            return
+
+        del pending[: sum(len(batch) for batch in batches)]
+        if not pending:
+            del self._pending[channel.id]  # type: ignore[attr-defined]
+
+        for batch in batches:
+            await self.send_batch(channel, locale, batch, stats)
+
+    async def flush_pending(self, stats: NotifyStats) -> None:
+        """Send every notification still waiting in a channel batch"""
+
+        pending, self._pending = self._pending, {}
+        jobs = []
+        for channel_id, deliveries in pending.items():
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                print(f'Notify channel {channel_id} is gone, {len(deliveries)} notifications dropped')
+                for delivery in deliveries:
+                    self.db.dead_letter_notify(stats.run_id, delivery.user_id, f'channel {channel_id} not found')
+                stats.failed += len(deliveries)
                 continue
-            except HTTPException:
+            locale = self.channel_locale(channel_id)
+            jobs.extend(self.send_batch(channel, locale, batch, stats) for batch in pack_deliveries(deliveries))  # type: ignore[arg-type]
+        for result in await asyncio.gather(*jobs, return_exceptions=True):
+            if isinstance(result, Exception):
+                traceback.print_exception(type(result), result, result.__traceback__)
+
+    async def send_batch(
+        self,
+        channel: discord.abc.Messageable,
+        locale: str,
+        batch: list[NotifyDelivery],
+        stats: NotifyStats,
+    ) -> None:
+        """Send the notifications of several users of a channel as one message"""
+
+        content = ' '.join(f'||{delivery.mention}||' for delivery in batch)
+        embeds = [embed for delivery in batch for embed in delivery.embeds]
+        skins = [(int(delivery.user_id), uuid, name) for delivery in batch for uuid, name in delivery.skins]
+        view = View.NotifyBatchView(self.db, skins, ResponseLanguage('notify_add', locale)) if skins else None
+
+        user_ids = [delivery.user_id for delivery in batch]
+        try:
+            async with self.channel_limit(channel.id):  # type: ignore[attr-defined]
+                # a user left 'sending' by a restart is not sent again, it may have been delivered
+                self.db.set_notify_status(stats.run_id, user_ids, 'sending')
+                message = await channel.send(content=content, embeds=embeds, view=view)  # type: ignore[arg-type]
+        except Forbidden as e:
+            print("Bot don't have perm send notification message.")
+            self.notify_failed(stats.run_id, user_ids, e)
+            stats.failed += len(batch)
+        except HTTPException as e:
+            print("Bot Can't send notification message.")
+            self.notify_failed(stats.run_id, user_ids, e)
+            stats.failed += len(batch)
+        except Exception as e:  # noqa: BLE001
+            print(f"Bot Can't send notification message: {e!r}")
+            self.notify_failed(stats.run_id, user_ids, e)
+            stats.failed += len(batch)
+        else:
+            self.db.set_notify_status(stats.run_id, user_ids, 'sent')
+            if view is not None:
+                view.message = message
+            stats.messages += 1
+
+    async def notify_worker(self, queue: asyncio.Queue[tuple[str, float]], stats: NotifyStats) -> None:
+        """Take users from the queue and notify them at their turn until it is empty"""
+
+        # commands keep priority over the notify run for Riot requests
+        request_priority.set(Priority.NOTIFY)
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                user_id, due = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            try:
+                await asyncio.sleep(due - loop.time())
+                self.db.set_notify_status(stats.run_id, [user_id], 'pending', attempt=True)
+                if not await self.notify_user(user_id, stats):
+                    self.db.set_notify_status(stats.run_id, [user_id], 'skipped')
+            # logged out, discord user deleted, channel or skin gone: not worth a retry
+            except (NotifyTargetError, NotFound, FileNotFoundError, DatabaseError) as e:
+                print(f'{user_id} can not be notified: {e!r}')
+                self.notify_failed(stats.run_id, [user_id], e, permanent=True)
+                stats.failed += 1
+            except Forbidden as e:
+                print("Bot don't have perm send notification message.")
+                self.notify_failed(stats.run_id, [user_id], e)
+                stats.failed += 1
+            except HTTPException as e:
                 print("Bot Can't send notification message.")
-                continue
-            except Exception as e:
+                self.notify_failed(stats.run_id, [user_id], e)
+                stats.failed += 1
+            except Exception as e:  # noqa: BLE001
                 print(e)
                 traceback.print_exception(type(e), e, e.__traceback__)
-                continue
+                self.notify_failed(stats.run_id, [user_id], e)
+                stats.failed += 1
+            finally:
+                stats.processed += 1
+                queue.task_done()
+
+    def notify_failed(self, run_id: str, user_ids: list[str], error: BaseException, permanent: bool = False) -> None:
+        """Queue failed notifications for a retry with exponential backoff, or dead-letter them"""
+
+        reason = f'{type(error).__name__}: {error}'
+        rotation_end = (datetime.fromisoformat(run_id) + timedelta(days=1)).replace(tzinfo=UTC).timestamp()
+        for user_id in user_ids:
+            attempts = self.db.get_notify_attempts(run_id, user_id)
+            delay = min(NOTIFY_RETRY_DELAY * 2 ** max(attempts - 1, 0), NOTIFY_RETRY_MAX_DELAY)
+            retry_at = _time.time() + delay * random.uniform(1, 1.5)  # noqa: S311
+            if permanent or attempts >= NOTIFY_MAX_ATTEMPTS or retry_at >= rotation_end:
+                self.db.dead_letter_notify(run_id, user_id, reason)
+            else:
+                self.db.retry_notify(run_id, user_id, retry_at, reason)
+
+    async def process_notify(self, queue: asyncio.Queue[tuple[str, float]], stats: NotifyStats) -> None:
+        """Notify every user of the queue with a pool of workers, then send the partial channel batches"""
+
+        workers = [
+            asyncio.create_task(self.notify_worker(queue, stats)) for _ in range(min(NOTIFY_CONCURRENCY, stats.total))
+        ]
+        try:
+            await asyncio.gather(*workers)
+            await self.flush_pending(stats)
+        finally:
+            for worker in workers:
+                worker.cancel()
+
+    @staticmethod
+    def notify_run_id() -> str:
+        """Id of the notify run of the current store rotation (the UTC day)"""
+        return datetime.now(UTC).date().isoformat()
+
+    @staticmethod
+    def notify_window(run_id: str) -> float:
+        """Seconds left of the window a run is spread over"""
+        elapsed = (datetime.now(UTC) - datetime.fromisoformat(run_id).replace(tzinfo=UTC)).total_seconds()
+        return max(NOTIFY_WINDOW - elapsed, 0.0)
+
+    async def send_notify(self) -> None:
+        if self._notify_lock.locked():
+            print('Waiting for the notify run in progress...')
+
+        # a run waits for the one in progress, then only takes the users it left pending
+        async with self._notify_lock:
+            # the journal records every user of the run, a restart resumes the users still pending
+            run_id = self.notify_run_id()
+            journal = self.db.start_notify_run(run_id)
+            notify_users = [user_id for user_id, (status, _) in journal.items() if status == 'pending']
+            if not notify_users:
+                print(f'Notify run {run_id} is already done')
+                return
+
+            # spread the users evenly over the rest of the window
+            stats = NotifyStats(run_id=run_id, total=len(notify_users))
+            window = self.notify_window(run_id)
+            start = asyncio.get_running_loop().time()
+            queue: asyncio.Queue[tuple[str, float]] = asyncio.Queue()
+            for position, user_id in enumerate(notify_users):
+                queue.put_nowait((user_id, start + window * position / stats.total))
+
+            progress = asyncio.create_task(self.notify_progress(stats))
+            try:
+                await self.process_notify(queue, stats)
+            finally:
+                progress.cancel()
+
+            print(f'Notify {run_id} finished: {stats}, HTTP {HTTPClient.stats}')
+            print(f'Riot queues: {HTTPClient.scheduler_report()}')
+
+    async def notify_progress(self, stats: NotifyStats, interval: float = 30) -> None:
+        """Print the progress of a notify run every ``interval`` seconds, sending partial channel batches"""
+        waited = 0.0
+        while True:
+            await asyncio.sleep(interval)
+            print(f'Notify progress: {stats}')
+            waited += interval
+            if waited >= NOTIFY_BATCH_WAIT:
+                waited = 0.0
+                # shielded, stopping the progress report must not cut a send in the middle
+                await asyncio.shield(self.flush_pending(stats))
 
     @tasks.loop(time=time(hour=0, minute=0, second=10))  # utc 00:00:15
     async def notifys(self) -> None:
@@ -128,6 +471,60 @@ class Notify(commands.Cog):
         await self.bot.wait_until_ready()
         print('Checking new store skins for notifys...')
 
+    @tasks.loop(seconds=TOKEN_REFRESH_INTERVAL)
+    async def refresh_tokens(self) -> None:
+        """Refresh tokens of notify and active users before they expire, so commands never wait for a refresh"""
+        if self.db is None:  # not ready yet
+            return
+        request_priority.set(Priority.PREFETCH)
+
+        # notify users only need a fresh token for the daily run, not all day
+        now = datetime.now(UTC)
+        next_run = datetime.combine(now.date() + timedelta(days=1), time(), tzinfo=UTC)
+        notify_before = None
+        if (next_run - now).total_seconds() <= TOKEN_REFRESH_NOTIFY_WINDOW:
+            notify_before = next_run.timestamp() + TOKEN_REFRESH_LEAD
+
+        refreshed = await self.db.refresh_expiring(TOKEN_REFRESH_LEAD, TOKEN_REFRESH_INTERVAL, notify_before)
+        if refreshed:
+            print(f'Refreshed {refreshed} tokens')
+
+    @refresh_tokens.before_loop
+    async def before_refresh_tokens(self) -> None:
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(seconds=NOTIFY_RETRY_INTERVAL)
+    async def retry_notifys(self) -> None:
+        """Send again the failed notifications whose retry is due"""
+        if self.db is None:  # not ready yet
+            return
+
+        # retries are drained between runs, a user is never processed by a run and a retry at once
+        if self._notify_lock.locked():
+            return
+
+        async with self._notify_lock:
+            run_id = self.notify_run_id()
+            user_ids = []
+            for retry_run_id, user_id in self.db.pop_notify_retries(_time.time()):
+                if retry_run_id == run_id:
+                    user_ids.append(user_id)
+                else:  # the store it was about is gone
+                    self.db.dead_letter_notify(retry_run_id, user_id, 'store rotated before the retry')
+            if not user_ids:
+                return
+
+            stats = NotifyStats(run_id=run_id, total=len(user_ids))
+            queue: asyncio.Queue[tuple[str, float]] = asyncio.Queue()
+            for user_id in user_ids:
+                queue.put_nowait((user_id, 0.0))
+            await self.process_notify(queue, stats)
+            print(f'Notify retries {run_id}: {stats}')
+
+    @retry_notifys.before_loop
+    async def before_retry_notifys(self) -> None:
+        await self.bot.wait_until_ready()
+
     notify = app_commands.Group(name='notify', description='Notify commands')
 
     @notify.command(name='add', description='Set a notification when a specific skin is available on your store')
@@ -146,21 +543,14 @@ class Notify(commands.Cog):
         # # setup emoji
         # await setup_emoji(self.bot, interaction.guild, interaction.locale)
 
-        # check file whether
-        create_json('notifys', [])  # type: ignore
-
         # get cache
         skin_data = self.db.read_cache()
 
         # find skin
-        skin_list = functools.reduce(operator.iadd, [list(skin_data['skins'][x]['names'].values()) for x in skin_data['skins']], [])  # get skin list with multilingual names
-        skin_name = get_close_matches(skin, skin_list, 1)  # get skin close match
+        skin_match = SkinSearch.get().search(skin)  # match multilingual skin names
 
-        if skin_name:
-            notify_data = JSON.read('notifys')
-
-            find_skin = [x for x in skin_data['skins'] if skin_name[0] in skin_data['skins'][x]['names'].values()]
-            skin_uuid = find_skin[0]
+        if skin_match:
+            skin_uuid = skin_match[0]
             skin_source = skin_data['skins'][skin_uuid]
 
             name = skin_source['names'][str(VLR_locale)]
@@ -169,38 +559,32 @@ class Notify(commands.Cog):
 
             emoji = GetEmoji.tier_by_bot(skin_uuid, self.bot)
 
-            for skin in notify_data:
-                if skin['id'] == str(interaction.user.id) and skin['uuid'] == skin_uuid:  # type: ignore
-                    skin_already = response.get('SKIN_ALREADY_IN_LIST')
-                    raise ValorantBotError(skin_already.format(emoji=emoji, skin=name))  # type: ignore
-
-            payload = {'id': str(interaction.user.id), 'uuid': skin_uuid}
-
-            try:
-                notify_data.append(payload)  # type: ignore
-                JSON.save('notifys', notify_data)
-            except AttributeError:
-                notify_data = [payload]
-                JSON.save('notifys', notify_data)  # type: ignore
+            if not self.db.add_notify(interaction.user.id, skin_uuid):
+                skin_already = response.get('SKIN_ALREADY_IN_LIST')
+                raise ValorantBotError(skin_already.format(emoji=emoji, skin=name))  # type: ignore[union-attr]
 
             # check if user is notify is on
-            userdata = JSON.read('users')
-            notify_mode = userdata.get('notify_mode', None)
-            if notify_mode is None:
-                userdata[str(interaction.user.id)]['notify_mode'] = 'Specified'
-                userdata[str(interaction.user.id)]['DM_Message'] = True
-                JSON.save('users', userdata)
+            self.db.enable_notify(interaction.user.id)
 
             success = response.get('SUCCESS')
             embed = Embed(success.format(emoji=emoji, skin=name))  # type: ignore
             embed.set_thumbnail(url=icon)
 
-            view = View.NotifyView(interaction.user.id, uuid, name, response)
+            view = View.NotifyView(self.db, interaction.user.id, uuid, name, response)
             await interaction.followup.send(embed=embed, view=view)
             return
 
         raise ValorantBotError(response.get('NOT_FOUND'))
 
+    @notify_add.autocomplete('skin')
+    async def notify_add_autocomplete(  # noqa: PLR6301
+        self,
+        interaction: Interaction,  # noqa: ARG002
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        names = PrefixIndex.get('skins', str(VLR_locale)).complete(current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
     @notify.command(name='list', description='View skins you have set a for notification.')
     # @dynamic_cooldown(cooldown_5s)
     async def notify_list(self, interaction: Interaction) -> None:
@@ -209,7 +593,7 @@ class Notify(commands.Cog):
         response = ResponseLanguage('notify_list', interaction.locale)
 
         await self.db.is_data(interaction.user.id, interaction.locale)
-        view = View.NotifyViewList(interaction, response)
+        view = View.NotifyViewList(interaction, self.db, response)
         await view.start()
 
     @notify.command(name='mode', description='Change notification mode/channel.')
@@ -271,16 +655,13 @@ class Notify(commands.Cog):
         response_send = ResponseLanguage('notify_send', interaction.locale)
         response_add = ResponseLanguage('notify_add', interaction.locale)
 
-        # notify list
-        notify_data = JSON.read('notifys')
-
         # get user data and offer
         endpoint, data = await self.get_endpoint_and_data(int(interaction.user.id))
-        offer = endpoint.store_fetch_storefront()
+        offer = await endpoint.store_fetch_storefront(section='SkinsPanelLayout')
 
         # offer data
         duration = offer['SkinsPanelLayout']['SingleItemOffersRemainingDurationInSeconds']
-        user_skin_list = [skin for skin in notify_data if skin['id'] == str(interaction.user.id)]
+        user_skin_list = self.db.get_notify_list(interaction.user.id)
 
         if len(user_skin_list) == 0:
             empty_list = response_test.get('EMPTY_LIST')
@@ -290,22 +671,11 @@ class Notify(commands.Cog):
 
         try:
             if data['notify_mode'] == 'Specified':
-                for notify in user_skin_list:
-                    uuid = notify['uuid']
-                    skin = GetItems.get_skin(uuid)
-
-                    name = skin['names'][str(VLR_locale)]
-                    icon = skin['icon']
-                    emoji = GetEmoji.tier_by_bot(uuid, self.bot)
-
-                    notify_send: str = response_send.get('RESPONSE_SPECIFIED')
-                    duration = format_relative(datetime.utcnow() + timedelta(seconds=duration))
-
-                    embed = Embed(notify_send.format(emoji=emoji, name=name, duration=duration), color=0xFD4554)
-                    embed.set_thumbnail(url=icon)
-                    view = View.NotifyView(interaction.user.id, uuid, name, response_add)
-                    view.message = await channel_send.send(embed=embed, view=view)
-                    break
+                uuid = user_skin_list[0]
+                embed = GetEmbed.notify_specified_send(uuid, str(interaction.locale), duration, self.bot)
+                name = GetItems.get_skin(uuid)['names'][str(VLR_locale)]
+                view = View.NotifyView(self.db, interaction.user.id, uuid, name, response_add)
+                view.message = await channel_send.send(embed=embed, view=view)
 
             elif data['notify_mode'] == 'All':
                 embeds = GetEmbed.notify_all_send(endpoint.player, offer, response_send, self.bot)
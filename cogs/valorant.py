@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
 from typing import TYPE_CHECKING, Literal
 
@@ -11,11 +12,14 @@ from utils.checks import owner_only
 from utils.errors import ValorantBotError
 from utils.locale_v2 import ValorantTranslator
 from utils.valorant import cache as Cache, useful, view as View
+from utils.valorant.auth import Auth
 from utils.valorant.db import DATABASE
 from utils.valorant.embed import Embed, GetEmbed
-from utils.valorant.endpoint import API_ENDPOINT
+from utils.valorant.endpoint import API_ENDPOINT, PlayerSession
+from utils.valorant.http import Priority, request_priority
 from utils.valorant.local import ResponseLanguage
 from utils.valorant.resources import setup_emoji
+from utils.valorant.search import PrefixIndex
 
 VLR_locale = ValorantTranslator()
 
@@ -28,29 +32,26 @@ class ValorantCog(commands.Cog, name='Valorant'):
 
     def __init__(self, bot: ValorantBot) -> None:
         self.bot: ValorantBot = bot
-        self.endpoint: API_ENDPOINT = MISSING
         self.db: DATABASE = MISSING
         self.reload_cache.start()
 
     def cog_unload(self) -> None:
         self.reload_cache.cancel()
 
-    def funtion_reload_cache(self, force: bool = False) -> None:
+    async def funtion_reload_cache(self, force: bool = False) -> None:
         """Reload the cache"""
         with contextlib.suppress(Exception):
-            cache = self.db.read_cache()
-            valorant_version = Cache.get_valorant_version()
-            if valorant_version != cache['valorant_version'] or force:
-                Cache.get_cache()
-                cache = self.db.read_cache()
-                cache['valorant_version'] = valorant_version
-                self.db.insert_cache(cache)
+            useful.CacheSnapshot.revalidate()
+            valorant_version = await Cache.get_valorant_version(self.bot.session)  # type: ignore[arg-type]
+            if valorant_version != useful.CacheSnapshot.version() or force:
+                await Cache.get_cache(self.bot.session, valorant_version)  # type: ignore[arg-type]
                 print('Updated cache')
 
     @tasks.loop(minutes=30)
     async def reload_cache(self) -> None:
         """Reload the cache every 30 minutes"""
-        self.funtion_reload_cache()
+        request_priority.set(Priority.PREFETCH)
+        await self.funtion_reload_cache()
 
     @reload_cache.before_loop
     async def before_reload_cache(self) -> None:
@@ -61,7 +62,6 @@ class ValorantCog(commands.Cog, name='Valorant'):
     async def on_ready(self) -> None:
         """When the bot is ready"""
         self.db = DATABASE()
-        self.endpoint = API_ENDPOINT()
 
     async def get_endpoint(
         self,
@@ -72,17 +72,17 @@ class ValorantCog(commands.Cog, name='Valorant'):
     ) -> API_ENDPOINT:
         """Get the endpoint for the user"""
         if username is not None and password is not None:
-            auth = self.db.auth
+            auth = Auth()
             auth.locale_code = locale_code  # type: ignore
             data = await auth.temp_auth(username, password)
+            player = PlayerSession.from_auth(data, locale_code=locale_code)  # type: ignore[arg-type]
         elif username or password:
             raise ValorantBotError('Please provide both username and password!')
         else:
-            data = await self.db.is_data(user_id, locale_code)  # type: ignore
-        data['locale_code'] = locale_code  # type: ignore
-        endpoint = self.endpoint
-        endpoint.activate(data)  # type: ignore
-        return endpoint
+            player = await self.db.get_session(user_id, locale_code)  # type: ignore[arg-type]
+
+        # sessions of temporary logins have no user to refresh, so they are never refreshed
+        return API_ENDPOINT(self.bot.session, player, locale_code, refresh=self.db.refresh_session)  # type: ignore[arg-type]
 
     @app_commands.command(description='Log in with your Riot acoount')
     @app_commands.describe(username='Input username', password='Input password')
@@ -91,7 +91,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
         response = ResponseLanguage(interaction.command.name, interaction.locale)  # type: ignore
 
         user_id = interaction.user.id
-        auth = self.db.auth
+        auth = Auth()
         auth.locale_code = interaction.locale  # type: ignore
         authenticate = await auth.authenticate(username, password)
 
@@ -146,12 +146,11 @@ class ValorantCog(commands.Cog, name='Valorant'):
         # get endpoint
         endpoint = await self.get_endpoint(interaction.user.id, interaction.locale)  # type: ignore
 
-        # fetch skin price
-        skin_price = endpoint.store_fetch_offers()
-        self.db.insert_skin_price(skin_price)
+        # skin price
+        await useful.PriceTable.refresh(endpoint.store_fetch_offers)
 
         # data
-        data = endpoint.store_fetch_storefront()
+        data = await endpoint.store_fetch_storefront(section='SkinsPanelLayout')
         embeds = GetEmbed.store(endpoint.player, data, response, self.bot)
         await interaction.followup.send(embeds=embeds, view=View.share_button(interaction, embeds))
 
@@ -175,7 +174,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
         endpoint = await self.get_endpoint(interaction.user.id, locale_code=interaction.locale.value)
 
         # data
-        data = endpoint.store_fetch_wallet()
+        data = await endpoint.store_fetch_wallet()
         embed = GetEmbed.point(endpoint.player, data, response, self.bot)
 
         await interaction.followup.send(embed=embed, view=View.share_button(interaction, [embed]))
@@ -193,7 +192,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
         endpoint = await self.get_endpoint(interaction.user.id, interaction.locale)  # type: ignore
 
         # data
-        data = endpoint.fetch_contracts()
+        data = await endpoint.fetch_contracts()
         embed = GetEmbed.mission(endpoint.player, data, response)
 
         await interaction.followup.send(embed=embed, view=View.share_button(interaction, [embed]))
@@ -218,12 +217,11 @@ class ValorantCog(commands.Cog, name='Valorant'):
         # endpoint
         endpoint = await self.get_endpoint(interaction.user.id, interaction.locale)  # type: ignore
 
-        # fetch skin price
-        skin_price = endpoint.store_fetch_offers()
-        self.db.insert_skin_price(skin_price)
+        # skin price
+        await useful.PriceTable.refresh(endpoint.store_fetch_offers)
 
         # data
-        data = endpoint.store_fetch_storefront()
+        data = await endpoint.store_fetch_storefront(section='BonusStore')
         embeds = GetEmbed.nightmarket(endpoint.player, data, self.bot, response)
 
         await interaction.followup.send(embeds=embeds, view=View.share_button(interaction, embeds))  # type: ignore
@@ -241,8 +239,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
         endpoint = await self.get_endpoint(interaction.user.id, interaction.locale)  # type: ignore
 
         # data
-        data = endpoint.fetch_contracts()
-        content = endpoint.fetch_content()
+        data, content = await asyncio.gather(endpoint.fetch_contracts(), endpoint.fetch_content())
         season = useful.get_season_by_content(content)
 
         embed = GetEmbed.battlepass(endpoint.player, data, season, response)
@@ -288,6 +285,15 @@ class ValorantCog(commands.Cog, name='Valorant'):
         view = View.BaseBundle(interaction, find_bundle, response)  # type: ignore
         await view.start()
 
+    @bundle.autocomplete('bundle')
+    async def bundle_autocomplete(  # noqa: PLR6301
+        self,
+        interaction: Interaction[ValorantBot],  # noqa: ARG002
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        names = PrefixIndex.get('bundles', str(VLR_locale)).complete(current)
+        return [app_commands.Choice(name=name, value=name) for name in names]
+
     # inspired by https://github.com/giorgi-o
     @app_commands.command(description='Show the current featured bundles')
     @app_commands.guild_only()
@@ -307,7 +313,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
         endpoint = await self.get_endpoint(interaction.user.id, interaction.locale.value)
 
         # data
-        bundle_entries = endpoint.store_fetch_storefront()
+        bundle_entries = await endpoint.store_fetch_storefront(section='FeaturedBundle')
 
         # bundle view
         view = View.BaseBundle(interaction, bundle_entries, response)
@@ -372,8 +378,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
             endpoint = await self.get_endpoint(interaction.user.id, interaction.locale.value)
 
             # fetch skin price
-            skin_price = endpoint.store_fetch_offers()
-            self.db.insert_skin_price(skin_price, force=True)
+            await useful.PriceTable.refresh(endpoint.store_fetch_offers, force=True)
 
         elif bug == 'Emoji not loading':
             if not interaction.guild:
@@ -382,7 +387,7 @@ class ValorantCog(commands.Cog, name='Valorant'):
             await setup_emoji(self.bot, interaction.guild, interaction.locale.value, force=True)
 
         elif bug == 'Cache not loading':
-            self.funtion_reload_cache(force=True)
+            await self.funtion_reload_cache(force=True)
 
         success: str = response.get('SUCCESS', 'success')
         await interaction.followup.send(embed=Embed(success.format(bug=bug)))
@@ -38,3 +38,9 @@ class DatabaseError(app_commands.AppCommandError):
     """
     Raised whenever there's a problem while attempting to access the database.
     """
+
+
+class NotifyTargetError(app_commands.AppCommandError):
+    """
+    Raised whenever the channel or a skin of a notification no longer exists.
+    """
@@ -4,7 +4,6 @@ DEMO TRANSLATION
 
 from __future__ import annotations
 
-import os
 from contextvars import ContextVar
 
 discord_locale = [
@@ -59,6 +58,10 @@ valorant_locale_overwrite = {
     'vi': 'vi-VN',  # vietnamese
 }
 
+
+# computed once, interactions only do a dict lookup
+valorant_locales = {locale: valorant_locale_overwrite.get(locale, 'en-US') for locale in discord_locale}
+
 _current_locale = ContextVar('_current_locale', default='en-US')
 _valorant_current_locale = ContextVar('_valorant_current_locale', default='en-US')
 
@@ -75,17 +78,17 @@ def set_interaction_locale(locale: str | None) -> None:
 
 def get_valorant_locale() -> str:
     """Get the locale for valorant api"""
-    return valorant_locale_overwrite.get(str(_valorant_current_locale.get()), 'en-US')
+    return _valorant_current_locale.get()
+
+
+def to_valorant_locale(locale: str | None) -> str:
+    """Get the valorant api locale of a discord locale"""
+    return valorant_locales.get(str(locale), 'en-US')
 
 
 def set_valorant_locale(locale: str | None) -> None:
     """Set the locale for valorant api"""
-
-    language_files = os.listdir('languages')
-    locale_json = str(locale) + '.json'
-    if locale_json not in language_files:
-        _valorant_current_locale.set('en-US')
-    _valorant_current_locale.set(locale)  # type: ignore[arg-type]
+    _valorant_current_locale.set(to_valorant_locale(locale))
 
 
 class ValorantTranslator:
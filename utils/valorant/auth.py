@@ -1,10 +1,13 @@
 # from __future__ import annotations
 
 # Standard
+import asyncio
+import base64
+import functools
 import json
 import re
 import ssl
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 # Third
@@ -37,6 +40,17 @@ def _extract_tokens_from_uri(url: str) -> tuple[str, str]:
         raise AuthenticationError('Cookies Invalid') from e
 
 
+def get_token_expiry(access_token: str) -> float:
+    """Get the expiry timestamp of an access token from its JWT ``exp`` claim, 59 minutes from now if unreadable"""
+    try:
+        payload = access_token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        expiry = float(claims['exp'])
+    except (IndexError, KeyError, TypeError, ValueError):
+        expiry = datetime.timestamp(datetime.now(UTC) + timedelta(minutes=59))
+    return expiry
+
+
 # https://developers.cloudflare.com/ssl/ssl-tls/cipher-suites/
 
 FORCED_CIPHERS = [
@@ -60,12 +74,42 @@ FORCED_CIPHERS = [
 ]
 
 
+@functools.cache
+def ssl_context() -> ssl.SSLContext:
+    """SSL context of Riot auth requests, built once"""
+    ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+    ctx.minimum_version = ssl.TLSVersion.TLSv1_3
+    ctx.set_ciphers(':'.join(FORCED_CIPHERS))
+    return ctx
+
+
 class ClientSession(aiohttp.ClientSession):
+    """Session of one auth flow, with its own cookie jar over the shared auth connection pool"""
+
+    _shared_connector: aiohttp.TCPConnector | None = None
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
-        ctx = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
-        ctx.minimum_version = ssl.TLSVersion.TLSv1_3
-        ctx.set_ciphers(':'.join(FORCED_CIPHERS))
-        super().__init__(*args, **kwargs, cookie_jar=aiohttp.CookieJar(), connector=aiohttp.TCPConnector(ssl=ctx))
+        super().__init__(
+            *args,
+            **kwargs,
+            cookie_jar=aiohttp.CookieJar(),
+            connector=self.shared_connector(),
+            connector_owner=False,
+        )
+
+    @classmethod
+    def shared_connector(cls) -> aiohttp.TCPConnector:
+        """Get the keep-alive connection pool shared by every auth flow"""
+        if cls._shared_connector is None or cls._shared_connector.closed:
+            cls._shared_connector = aiohttp.TCPConnector(ssl=ssl_context(), keepalive_timeout=60)
+        return cls._shared_connector
+
+    @classmethod
+    async def close_shared(cls) -> None:
+        """Close the shared connection pool"""
+        if cls._shared_connector is not None:
+            await cls._shared_connector.close()
+            cls._shared_connector = None
 
 
 class Auth:
@@ -229,6 +273,17 @@ class Auth:
         else:
             return region
 
+    async def handshake(self, access_token: str, token_id: str) -> dict[str, Any]:
+        """Get the entitlements token, player info and region of a fresh access token, concurrently"""
+
+        entitlements_token, (puuid, name, tag), region = await asyncio.gather(
+            self.get_entitlements_token(access_token),
+            self.get_userinfo(access_token),
+            self.get_region(access_token, token_id),
+        )
+        player_name = f'{name}#{tag}' if tag is not None and tag is not None else 'no_username'
+        return {'emt': entitlements_token, 'puuid': puuid, 'player_name': player_name, 'region': region}
+
     async def give2facode(self, code: str, cookies: dict[str, Any]) -> dict[str, Any]:
         """This function is used to give the 2FA code."""
 
@@ -309,17 +364,19 @@ class Auth:
             access_token = authenticate['data']['access_token']  # type: ignore
             token_id = authenticate['data']['token_id']  # type: ignore
 
-            entitlements_token = await self.get_entitlements_token(access_token)
-            puuid, name, tag = await self.get_userinfo(access_token)
-            region = await self.get_region(access_token, token_id)
-            player_name = f'{name}#{tag}' if tag is not None and tag is not None else 'no_username'
+            player = await self.handshake(access_token, token_id)
 
             headers = {
                 'Content-Type': 'application/json',
                 'Authorization': f'Bearer {access_token}',
-                'X-Riot-Entitlements-JWT': entitlements_token,
+                'X-Riot-Entitlements-JWT': player['emt'],
+            }
+            return {
+                'puuid': player['puuid'],
+                'region': player['region'],
+                'headers': headers,
+                'player_name': player['player_name'],
             }
-            return {'puuid': puuid, 'region': region, 'headers': headers, 'player_name': player_name}
 
         raise AuthenticationError(self.local_response().get('TEMP_LOGIN_NOT_SUPPORT_2FA'))
 
@@ -1,37 +1,52 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
+import asyncio
+import random
+import time
+from itertools import starmap
+from typing import Any, ClassVar
 
 from ..errors import DatabaseError
-from .auth import Auth
-from .cache import fetch_price
+from .auth import Auth, get_token_expiry
+from .endpoint import PlayerSession
 from .local import LocalErrorResponse
-from .useful import JSON
+from .storage import get_storage
+from .useful import JSON, CacheSnapshot
 
 
 def timestamp_utc() -> float:
-    return datetime.timestamp(datetime.utcnow())
+    return time.time()
 
 
-class DATABASE:
+class DATABASE:  # noqa: PLR0904
     _version = 1
 
+    # player sessions shared by every DATABASE instance, cached until the access token expires
+    _sessions: ClassVar[dict[int, PlayerSession]] = {}
+
+    # one token refresh per user at a time, concurrent callers wait for it
+    _refresh_locks: ClassVar[dict[int, asyncio.Lock]] = {}
+
+    # backoff of the background refresh of a user whose cookies keep failing, doubled after every failure
+    refresh_retry_delay = 5 * 60
+    refresh_retry_max_delay = 24 * 60 * 60
+
     def __init__(self) -> None:
         """Initialize database"""
         self.auth = Auth()
+        self.storage = get_storage()
 
-    def insert_user(self, data: dict[str, Any]) -> None:
-        """Insert user"""
-        JSON.save('users', data)
+    def get_user(self, user_id: int) -> dict[str, Any] | None:
+        """Get user data"""
+        return self.storage.get_user(user_id)
 
-    def read_db(self) -> dict[str, Any]:
-        """Read database"""
-        return JSON.read('users')
+    def insert_user(self, user_id: int, data: dict[str, Any]) -> None:
+        """Insert user"""
+        self.storage.set_user(user_id, data)
 
     def read_cache(self) -> dict[str, Any]:
-        """Read database"""
-        return JSON.read('cache')
+        """Read the shared cache snapshot (read-only)"""
+        return CacheSnapshot.get()
 
     def insert_cache(self, data: dict[str, Any]) -> None:
         """Insert cache"""
@@ -40,8 +55,7 @@ class DATABASE:
     async def is_login(self, user_id: int, response: dict[str, Any]) -> dict[str, Any] | bool | None:
         """Check if user is logged in"""
 
-        db = self.read_db()
-        data = db.get(str(user_id), None)
+        data = self.get_user(user_id)
 
         login = False
 
@@ -57,7 +71,6 @@ class DATABASE:
         # language
         response = LocalErrorResponse('DATABASE', locale_code)
 
-        db = self.read_db()
         auth = self.auth
 
         auth_data = data['data']
@@ -66,12 +79,11 @@ class DATABASE:
         token_id = auth_data['token_id']
 
         try:
-            entitlements_token = await auth.get_entitlements_token(access_token)
-            puuid, name, tag = await auth.get_userinfo(access_token)
-            region = await auth.get_region(access_token, token_id)
-            player_name = f'{name}#{tag}' if tag is not None and tag is not None else 'no_username'
+            player = await auth.handshake(access_token, token_id)
+            entitlements_token, puuid, region = player['emt'], player['puuid'], player['region']
+            player_name = player['player_name']
 
-            expiry_token = datetime.timestamp(datetime.utcnow() + timedelta(minutes=59))
+            expiry_token = get_token_expiry(access_token)
 
             data = {
                 'cookie': cookie,
@@ -86,9 +98,8 @@ class DATABASE:
                 'DM_Message': True,
             }
 
-            db[str(user_id)] = data
-
-            self.insert_user(db)
+            self.insert_user(user_id, data)
+            self._sessions.pop(int(user_id), None)
 
         except Exception as e:
             print(e)
@@ -103,16 +114,16 @@ class DATABASE:
         response = LocalErrorResponse('DATABASE', locale_code)
 
         try:
-            db = self.read_db()
-            del db[str(user_id)]
-            self.insert_user(db)
-        except KeyError as e:
-            raise DatabaseError(response.get('LOGOUT_ERROR')) from e
+            deleted = self.storage.delete_user(user_id)
         except Exception as e:
             print(e)
             raise DatabaseError(response.get('LOGOUT_EXCEPT')) from e
-        else:
-            return True
+
+        self._sessions.pop(int(user_id), None)
+
+        if not deleted:
+            raise DatabaseError(response.get('LOGOUT_ERROR'))
+        return True
 
     async def is_data(self, user_id: int, locale_code: str = 'en-US') -> dict[str, Any] | None:
         """Check if user is registered"""
@@ -120,19 +131,31 @@ class DATABASE:
         response = LocalErrorResponse('DATABASE', locale_code)
 
         auth = await self.is_login(user_id, response)
-        puuid = auth['puuid']  # type: ignore
-        region = auth['region']  # type: ignore
-        username = auth['username']  # type: ignore
-        access_token = auth['access_token']  # type: ignore
-        entitlements_token = auth['emt']  # type: ignore
-        notify_mode = auth['notify_mode']  # type: ignore
-        expiry_token = auth['expiry_token']  # type: ignore
-        cookie = auth['cookie']  # type: ignore
-        notify_channel = auth.get('notify_channel', None)  # type: ignore
-        dm_message = auth.get('DM_Message', None)  # type: ignore
+        if timestamp_utc() <= auth['expiry_token']:  # type: ignore[index]
+            return await self._is_data(user_id, auth)  # type: ignore[arg-type]
+
+        # the cookie is redeemed under the refresh lock, so concurrent callers never redeem it twice
+        async with self._refresh_lock(user_id):
+            auth = await self.is_login(user_id, response)
+            return await self._is_data(user_id, auth)  # type: ignore[arg-type]
+
+    async def _is_data(self, user_id: int, auth: dict[str, Any]) -> dict[str, Any]:
+        """Get the data of a registered user, refreshing an expired token; the caller holds the refresh lock"""
+
+        puuid = auth['puuid']
+        region = auth['region']
+        username = auth['username']
+        access_token = auth['access_token']
+        entitlements_token = auth['emt']
+        notify_mode = auth['notify_mode']
+        expiry_token = auth['expiry_token']
+        cookie = auth['cookie']
+        notify_channel = auth.get('notify_channel', None)
+        dm_message = auth.get('DM_Message', None)
 
         if timestamp_utc() > expiry_token:
-            access_token, entitlements_token = await self.refresh_token(user_id, auth)  # type: ignore
+            access_token, entitlements_token = await self.refresh_token(user_id, auth)
+            expiry_token = auth['expiry_token']
 
         headers = {'Authorization': f'Bearer {access_token}', 'X-Riot-Entitlements-JWT': entitlements_token}
 
@@ -145,6 +168,123 @@ class DATABASE:
             'cookie': cookie,
             'notify_channel': notify_channel,
             'dm_message': dm_message,
+            'expiry_token': expiry_token,
+        }
+
+    async def get_session(self, user_id: int, locale_code: str = 'en-US') -> PlayerSession:
+        """Get the player session of user, cached until its access token expires"""
+
+        session = self._sessions.get(int(user_id))
+        if session is not None and not session.is_expired():
+            return session
+
+        async with self._refresh_lock(user_id):
+            session = self._sessions.get(int(user_id))
+            if session is None or session.is_expired():
+                auth = await self.is_login(user_id, LocalErrorResponse('DATABASE', locale_code))
+                data = await self._is_data(user_id, auth)  # type: ignore[arg-type]
+                session = PlayerSession.from_auth(data, int(user_id), locale_code)  # type: ignore[arg-type]
+                self._sessions[int(user_id)] = session
+        return session
+
+    def _refresh_lock(self, user_id: int) -> asyncio.Lock:
+        lock = self._refresh_locks.get(int(user_id))
+        if lock is None:
+            lock = self._refresh_locks[int(user_id)] = asyncio.Lock()
+        return lock
+
+    async def refresh_session(self, player: PlayerSession) -> PlayerSession:
+        """Refresh the tokens of a session rejected by Riot and get the new session"""
+
+        user_id = int(player.user_id)  # type: ignore[arg-type]
+        async with self._refresh_lock(user_id):
+            session = self._sessions.get(user_id)
+            if session is not None and session is not player and not session.is_expired():
+                return session  # already refreshed by another request
+
+            data = self.get_user(user_id)
+            if data is None:
+                raise DatabaseError(LocalErrorResponse('DATABASE', 'en-US').get('NOT_LOGIN'))
+            await self.refresh_token(user_id, data)
+
+            data = await self._is_data(user_id, data)
+            session = PlayerSession.from_auth(data, user_id)  # type: ignore[arg-type]
+            self._sessions[user_id] = session
+        return session
+
+    def get_expiring_users(self, before: float, notify_before: float | None = None) -> list[tuple[str, float]]:
+        """Get ``(user_id, deadline)`` of users to keep logged in whose token expires before their deadline
+
+        Users with a cached session are kept logged in all day (``before``), notify users only for the daily
+        notify run (``notify_before``, None outside its lead window). Users in refresh backoff are skipped.
+        """
+
+        # a session is dropped when its token is refreshed, so only users active since the last refresh have one
+        users = []
+        for user_id, notify, expiry in self.storage.get_expiring_users(
+            max(before, notify_before or 0), timestamp_utc()
+        ):
+            if notify and notify_before is not None and expiry < notify_before:
+                users.append((user_id, notify_before))
+            elif int(user_id) in self._sessions and expiry < before:
+                users.append((user_id, before))
+        return users
+
+    async def refresh_user(self, user_id: int | str, before: float) -> bool:
+        """Refresh the token of user if it still expires before ``before``, returns True if refreshed"""
+
+        async with self._refresh_lock(int(user_id)):
+            data = self.get_user(int(user_id))
+            if data is None or data.get('expiry_token', 0) >= before:
+                return False  # logged out or refreshed meanwhile
+            await self.refresh_token(int(user_id), data)
+        return True
+
+    def refresh_failed(self, user_id: int | str, error: Exception) -> None:
+        """Back off the background refresh of user, until it succeeds again or the user logs in again"""
+
+        user = self.get_user(int(user_id))
+        if user is None:
+            return
+        failures = user.get('refresh_failures', 0) + 1
+        delay = min(self.refresh_retry_delay * 2 ** (failures - 1), self.refresh_retry_max_delay)
+        user['refresh_failures'] = failures
+        user['refresh_after'] = timestamp_utc() + delay
+        self.insert_user(int(user_id), user)
+        print(f'Failed to refresh token of {user_id} ({failures} in a row, next try in {delay // 60} min): {error}')
+
+    async def refresh_expiring(
+        self, lead: float, spread: float, notify_before: float | None = None, concurrency: int = 4
+    ) -> int:
+        """Refresh tokens expiring in the next ``lead`` seconds, spread randomly over ``spread`` seconds
+
+        Notify users are refreshed only when ``notify_before`` is given, if their token expires before it.
+        """
+
+        before = timestamp_utc() + lead
+        limit = asyncio.Semaphore(concurrency)
+        refreshed = 0
+
+        async def refresh(user_id: str, deadline: float) -> None:
+            nonlocal refreshed
+            await asyncio.sleep(random.uniform(0, spread))  # noqa: S311
+            async with limit:
+                try:
+                    refreshed += await self.refresh_user(user_id, deadline)
+                except Exception as e:  # noqa: BLE001
+                    self.refresh_failed(user_id, e)
+
+        await asyncio.gather(*starmap(refresh, self.get_expiring_users(before, notify_before)))
+        return refreshed
+
+    def get_notify_settings(self, user_id: int) -> dict[str, Any]:
+        """Get notify mode and channel of user"""
+
+        user = self.get_user(user_id) or {}
+        return {
+            'notify_mode': user.get('notify_mode'),
+            'notify_channel': user.get('notify_channel'),
+            'dm_message': user.get('DM_Message'),
         }
 
     async def refresh_token(self, user_id: int, data: dict[str, Any]) -> tuple[str, str]:
@@ -154,68 +294,124 @@ class DATABASE:
 
         cookies, access_token, entitlements_token = await auth.redeem_cookies(data['cookie'])
 
-        expired_cookie = datetime.timestamp(datetime.utcnow() + timedelta(minutes=59))
-
-        db = self.read_db()
-        db[str(user_id)]['cookie'] = cookies['cookie']
-        db[str(user_id)]['access_token'] = access_token
-        db[str(user_id)]['emt'] = entitlements_token
-        db[str(user_id)]['expiry_token'] = expired_cookie
+        tokens = {
+            'cookie': cookies['cookie'],
+            'access_token': access_token,
+            'emt': entitlements_token,
+            'expiry_token': get_token_expiry(access_token),
+        }
+        data.update(tokens)
 
-        self.insert_user(db)
+        # re-read the row, a logout or settings change may have landed during the redeem
+        user = self.get_user(user_id)
+        if user is not None:
+            user.update(tokens)
+            user.pop('refresh_failures', None)
+            user.pop('refresh_after', None)
+            self.insert_user(user_id, user)
+        self._sessions.pop(int(user_id), None)
 
         return access_token, entitlements_token
 
     def change_notify_mode(self, user_id: int, mode: str | None = None) -> None:
         """Change notify mode"""
 
-        db = self.read_db()
+        user = self.get_user(user_id)
 
         overite_mode = {'All Skin': 'All', 'Specified Skin': 'Specified', 'Off': None}
-        db[str(user_id)]['notify_mode'] = overite_mode[mode]  # type: ignore
+        user['notify_mode'] = overite_mode[mode]  # type: ignore[index]
 
-        self.insert_user(db)
+        self.insert_user(user_id, user)  # type: ignore[arg-type]
 
     def change_notify_channel(self, user_id: int, channel: str, channel_id: int | None = None) -> None:
         """Change notify mode"""
 
-        db = self.read_db()
+        user = self.get_user(user_id)
 
         if channel == 'DM Message':
-            db[str(user_id)]['DM_Message'] = True
-            db[str(user_id)].pop('notify_channel', None)
+            user['DM_Message'] = True  # type: ignore[index]
+            user.pop('notify_channel', None)  # type: ignore[union-attr]
         elif channel == 'Channel':
-            db[str(user_id)]['DM_Message'] = False
-            db[str(user_id)]['notify_channel'] = channel_id
+            user['DM_Message'] = False  # type: ignore[index]
+            user['notify_channel'] = channel_id  # type: ignore[index]
 
-        self.insert_user(db)
+        self.insert_user(user_id, user)  # type: ignore[arg-type]
+
+    def enable_notify(self, user_id: int) -> None:
+        """Turn on specified notify mode (DM) if the user has not set a notify mode yet"""
+
+        user = self.get_user(user_id)
+        if user is not None and user.get('notify_mode') is None:
+            user['notify_mode'] = 'Specified'
+            user['DM_Message'] = True
+            self.insert_user(user_id, user)
 
     def check_notify_list(self, user_id: int) -> None:
-        database = JSON.read('notifys')
-        notify_skin = [x for x in database if x['id'] == str(user_id)]  # type: ignore
+        notify_skin = self.get_notify_list(user_id)
         if len(notify_skin) == 0:
             raise DatabaseError("You're notification list is empty!")
 
+    def get_notify_list(self, user_id: int) -> list[str]:
+        """Get skin uuids in user notify list"""
+        return self.storage.notify_index.skins_of(user_id)
+
+    def add_notify(self, user_id: int, skin_uuid: str) -> bool:
+        """Add skin to user notify list"""
+        return self.storage.add_notify(user_id, skin_uuid)
+
+    def remove_notify(self, user_id: int, skin_uuid: str) -> bool:
+        """Remove skin from user notify list"""
+        return self.storage.remove_notify(user_id, skin_uuid)
+
+    def get_notify_matches(self, user_id: int | str, skin_uuids: list[str]) -> list[str]:
+        """Get the skins in ``skin_uuids`` that are in user notify list"""
+        return self.storage.notify_index.match(user_id, skin_uuids)
+
+    def get_notify_subscribers(self, skin_uuid: str) -> set[str]:
+        """Get users that have skin in their notify list"""
+        return self.storage.notify_index.users_of(skin_uuid)
+
     def get_user_is_notify(self) -> list[Any]:
         """Get user is notify"""
 
-        database = JSON.read('users')
-        return [user_id for user_id in database if database[user_id]['notify_mode'] is not None]
+        return self.storage.get_notify_users()
 
-    def insert_skin_price(self, skin_price: dict[str, Any], force: bool = False) -> None:
-        """Insert skin price to cache"""
+    def start_notify_run(self, run_id: str) -> dict[str, tuple[str, int]]:
+        """Get the journal of a notify run, created with every notify user pending if it does not exist yet"""
 
-        cache = self.read_cache()
-        price = cache['prices']
-        check_price = price.get('is_price', None)
-        if check_price is False or force:
-            fetch_price(skin_price)
+        if self.storage.create_notify_run(run_id, self.get_user_is_notify()):
+            self.storage.delete_notify_runs(keep=run_id)
+        return self.storage.get_notify_run(run_id)
+
+    def get_notify_run(self, run_id: str) -> dict[str, tuple[str, int]]:
+        """Get the journal of a notify run, ``{user_id: (status, attempts)}``"""
+        return self.storage.get_notify_run(run_id)
+
+    def set_notify_status(self, run_id: str, user_ids: list[str], status: str, attempt: bool = False) -> None:
+        """Record the status of users in a notify run"""
+        self.storage.set_notify_status(run_id, user_ids, status, attempt)
+
+    def get_notify_attempts(self, run_id: str, user_id: str) -> int:
+        """Get how many times a user of a notify run was attempted"""
+        status = self.storage.get_notify_run(run_id, user_id).get(str(user_id))
+        return 0 if status is None else status[1]
+
+    def retry_notify(self, run_id: str, user_id: str, retry_at: float, error: str) -> None:
+        """Queue a failed notification to be retried at ``retry_at``"""
+        self.storage.push_notify_retry(run_id, user_id, retry_at, error)
+
+    def pop_notify_retries(self, before: float) -> list[tuple[str, str]]:
+        """Take the notifications whose retry is due"""
+        return self.storage.pop_notify_retries(before)
+
+    def dead_letter_notify(self, run_id: str, user_id: str, error: str) -> None:
+        """Give up on a failed notification"""
+        self.storage.add_notify_dead_letter(run_id, user_id, self.get_notify_attempts(run_id, user_id), error)
 
     async def cookie_login(self, user_id: int, cookie: dict[str, Any] | str, locale_code: str) -> dict[str, Any] | None:
         """Login with cookie"""
 
-        db = self.read_db()
-        auth = self.auth
+        auth = Auth()
         auth.locale_code = locale_code
 
         data = await auth.login_with_cookie(cookie)
@@ -225,11 +421,12 @@ class DATABASE:
         token_id = data['token_id']
         entitlements_token = data['emt']
 
-        puuid, name, tag = await auth.get_userinfo(access_token)
-        region = await auth.get_region(access_token, token_id)
+        (puuid, name, tag), region = await asyncio.gather(
+            auth.get_userinfo(access_token), auth.get_region(access_token, token_id)
+        )
         player_name = f'{name}#{tag}' if tag is not None and tag is not None else 'no_username'
 
-        expiry_token = datetime.timestamp(datetime.utcnow() + timedelta(minutes=59))
+        expiry_token = get_token_expiry(access_token)
 
         try:
             data = {
@@ -245,8 +442,8 @@ class DATABASE:
                 'DM_Message': True,
             }
 
-            db[str(user_id)] = data
-            self.insert_user(db)
+            self.insert_user(user_id, data)
+            self._sessions.pop(int(user_id), None)
 
         except Exception as e:
             print(e)
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import contextlib
-from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any, ClassVar
 
 import discord
 
-from ..locale_v2 import ValorantTranslator
-from .useful import JSON, GetEmoji, GetFormat, calculate_level_xp, format_relative, iso_to_time
+from ..locale_v2 import ValorantTranslator, to_valorant_locale
+from .local import ResponseLanguage
+from .useful import (
+    CacheSnapshot,
+    GetEmoji,
+    GetFormat,
+    GetItems,
+    calculate_level_xp,
+    format_relative,
+    iso_to_time,
+)
 
 VLR_locale = ValorantTranslator()
 
@@ -119,7 +128,7 @@ class GetEmbed:
         # language
         title_point = response.get('POINT')
 
-        cache = JSON.read('cache')
+        cache = CacheSnapshot.get()
         point = cache['currencies']
 
         vp_uuid = '85ad13f7-3d1b-5128-9eb2-7cd8ee0b5741'
@@ -238,8 +247,42 @@ class GetEmbed:
 
     # ---------- NOTIFY EMBED ---------- #
 
-    @staticmethod
-    def notify_specified_send(uuid: str) -> discord.Embed: ...
+    # skin embeds rendered for the current store rotation, shared by every user of a notify run
+    _notify_embeds: ClassVar[dict[tuple[Any, ...], discord.Embed]] = {}
+    _notify_reset: ClassVar[datetime | None] = None
+
+    @classmethod
+    def _reset_at(cls, duration: int) -> datetime:
+        """End of the store rotation, rounded to the minute so every user of a rotation gets the same one"""
+
+        reset_at = datetime.now(UTC) + timedelta(seconds=duration + 30)
+        reset_at = reset_at.replace(second=0, microsecond=0)
+
+        # a new rotation makes every rendered embed stale
+        if cls._notify_reset is None or reset_at > cls._notify_reset:
+            cls._notify_embeds.clear()
+            cls._notify_reset = reset_at
+        return reset_at
+
+    @classmethod
+    def notify_specified_send(cls, uuid: str, locale: str, duration: int, bot: ValorantBot) -> discord.Embed:
+        """Embed of a skin in the notify list, rendered once per (skin, locale, rotation)"""
+
+        reset_at = cls._reset_at(duration)
+        key = (uuid, str(locale), reset_at)
+        embed = cls._notify_embeds.get(key)
+        if embed is None:
+            skin = GetItems.get_skin(uuid)
+            name = skin['names'][to_valorant_locale(locale)]
+            emoji = GetEmoji.tier_by_bot(uuid, bot)
+
+            notify_send: str = ResponseLanguage('notify_send', locale).get('RESPONSE_SPECIFIED')  # type: ignore[assignment]
+            embed = Embed(
+                notify_send.format(emoji=emoji, name=name, duration=format_relative(reset_at)), color=0xFD4554
+            )
+            embed.set_thumbnail(url=skin['icon'])
+            cls._notify_embeds[key] = embed
+        return embed
 
     @classmethod
     def notify_all_send(
@@ -254,13 +297,19 @@ class GetEmbed:
         data = GetFormat.offer_format(offer)
 
         duration = data.pop('duration')
+        reset_at = cls._reset_at(duration)
 
         description = description_format.format(  # type: ignore
             username=player,
-            duration=format_relative(datetime.utcnow() + timedelta(seconds=duration)),
+            duration=format_relative(reset_at),
         )
         embed = Embed(description)
         embeds = [embed]
-        [embeds.append(cls.__giorgio_embed(data[skin], bot)) for skin in data]  # type: ignore
-
-        return embeds  # type: ignore
+        for skin in data.values():
+            key = (skin['uuid'], skin['name'], skin['price'], reset_at)
+            skin_embed = cls._notify_embeds.get(key)
+            if skin_embed is None:
+                skin_embed = cls._notify_embeds[key] = cls.__giorgio_embed(skin, bot)
+            embeds.append(skin_embed)
+
+        return embeds
@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 # Standard
+import asyncio
 import json
-from typing import Any
-
-import requests
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from ..errors import HandshakeError, ResponseError
+from .http import HTTPClient
 from .local import LocalErrorResponse
 
 # Local
@@ -20,57 +23,271 @@ from .resources import (
     shard_region_override,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping
+
+    import aiohttp
+
+
+class ClientVersion:
+    """Process-wide cache of the Riot client version used in the ``X-Riot-ClientVersion`` header
+
+    The version only changes with a game patch, so it is fetched once and then served from memory.
+    Once the TTL has passed the cached value is still returned while a refresh runs in the
+    background (stale-while-revalidate); a slow or failing valorant-api.com never blocks a command
+    unless there is no cached value at all. ``reload_cache`` refreshes it together with the cache
+    version check.
+    """
+
+    url = 'https://valorant-api.com/v1/version'
+    ttl = 60 * 60  # 1 hour
+    timeout = 5
+
+    _value: str | None = None
+    _fetched_at: float = 0.0
+    _task: asyncio.Task[str] | None = None
+
+    @staticmethod
+    def format(data: dict[str, Any]) -> str:
+        """Format the client version string from valorant-api.com ``/v1/version`` data"""
+        return f'{data["branch"]}-shipping-{data["buildVersion"]}-{data["version"].split(".")[3]}'
+
+    @classmethod
+    def set(cls, data: dict[str, Any]) -> None:
+        """Update the cached version from already fetched ``/v1/version`` data"""
+        cls._value = cls.format(data)
+        cls._fetched_at = time.monotonic()
+
+    @classmethod
+    async def _fetch(cls, session: aiohttp.ClientSession) -> str:
+        data = (await HTTPClient.get_json(session, cls.url, timeout=cls.timeout))['data']
+        cls.set(data)
+        return cls._value  # type: ignore[return-value]
+
+    @classmethod
+    def _refresh_task(cls, session: aiohttp.ClientSession) -> asyncio.Task[str]:
+        """Get the in-flight refresh, starting one if needed"""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._fetch(session))
+            cls._task.add_done_callback(cls._on_refreshed)
+        return cls._task
+
+    @staticmethod
+    def _on_refreshed(task: asyncio.Task[str]) -> None:
+        if not task.cancelled() and (e := task.exception()) is not None:
+            print(f'Failed to refresh client version: {e}')
+
+    @classmethod
+    async def get(cls, session: aiohttp.ClientSession) -> str:
+        """Get the client version"""
+        if cls._value is None:
+            return await asyncio.shield(cls._refresh_task(session))
+        if time.monotonic() - cls._fetched_at > cls.ttl:
+            cls._refresh_task(session)
+        return cls._value
+
+
+class StorefrontCache:
+    """Process-wide cache of storefronts by puuid
+
+    A storefront does not change until its sections rotate, so each section is kept until its own
+    remaining duration runs out. Cached storefronts are served with every remaining duration
+    reduced by the time spent in the cache.
+    """
+
+    # section: key of its remaining duration inside the section
+    sections: ClassVar[dict[str, str]] = {
+        'SkinsPanelLayout': 'SingleItemOffersRemainingDurationInSeconds',
+        'BonusStore': 'BonusStoreRemainingDurationInSeconds',
+        'FeaturedBundle': 'BundleRemainingDurationInSeconds',
+        'AccessoryStore': 'AccessoryStoreRemainingDurationInSeconds',
+    }
+
+    # puuid: (fetched at, storefront, section expiry)
+    _entries: ClassVar[dict[str, tuple[float, dict[str, Any], dict[str, float]]]] = {}
+
+    @staticmethod
+    def _elapse(value: Any, seconds: int) -> Any:
+        """Copy of ``value`` with every remaining duration reduced by ``seconds``"""
+        if isinstance(value, dict):
+            return {
+                key: max(item - seconds, 0)
+                if isinstance(item, int) and key.endswith(('RemainingDurationInSeconds', 'DurationRemainingInSeconds'))
+                else StorefrontCache._elapse(item, seconds)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [StorefrontCache._elapse(item, seconds) for item in value]
+        return value
+
+    @classmethod
+    def _expiry(cls, data: dict[str, Any], now: float) -> dict[str, float]:
+        expiry: dict[str, float] = {}
+        for section, duration_key in cls.sections.items():
+            duration = data.get(section, {}).get(duration_key)
+            if isinstance(duration, int):
+                expiry[section] = now + duration
+
+        # every featured bundle has its own duration, the section is stale once the first one rotates
+        bundles = data.get('FeaturedBundle', {}).get('Bundles', [])
+        durations = [
+            bundle['DurationRemainingInSeconds'] for bundle in bundles if 'DurationRemainingInSeconds' in bundle
+        ]
+        if durations:
+            expiry['FeaturedBundle'] = min(expiry.get('FeaturedBundle', float('inf')), now + min(durations))
+
+        # a section that is not in the store (night market is off) is not expected before the next daily rotation
+        default = expiry.get('SkinsPanelLayout', now)
+        for section in cls.sections:
+            expiry.setdefault(section, default)
+        return expiry
+
+    @classmethod
+    def get(cls, puuid: str, section: str | None = None) -> dict[str, Any] | None:
+        """Get the cached storefront if ``section`` (every section if None) has not rotated yet"""
+        entry = cls._entries.get(puuid)
+        if entry is None:
+            return None
 
-class API_ENDPOINT:
-    def __init__(self) -> None:
-        from .auth import Auth
+        fetched_at, data, expiry = entry
+        now = time.time()
+        expires_at = min(expiry.values()) if section is None else expiry.get(section, 0.0)
+        if now >= expires_at:
+            return None
+        return cls._elapse(data, int(now - fetched_at))  # type: ignore[no-any-return]
 
-        self.auth = Auth()
+    @classmethod
+    def set(cls, puuid: str, data: dict[str, Any]) -> None:
+        """Cache a freshly fetched storefront"""
+        now = time.time()
+        cls._entries[puuid] = (now, data, cls._expiry(data, now))
 
-        # self.headers = {}
-        # self.puuid = ''
-        # self.player = ''
-        # self.region = ''
-        # self.shard = ''
-        # self.pd = ''
-        # self.shared = ''
-        # self.glz = ''
+        # drop storefronts that are fully rotated
+        for key in [key for key, (_, _, expiry) in cls._entries.items() if max(expiry.values()) <= now]:
+            del cls._entries[key]
 
-        # client platform
-        self.client_platform = 'ew0KCSJwbGF0Zm9ybVR5cGUiOiAiUEMiLA0KCSJwbGF0Zm9ybU9TIjogIldpbmRvd3MiLA0KCSJwbGF0Zm9ybU9TVmVyc2lvbiI6ICIxMC4wLjE5MDQyLjEuMjU2LjY0Yml0IiwNCgkicGxhdGZvcm1DaGlwc2V0IjogIlVua25vd24iDQp9'
 
-        # language
-        self.locale_code = 'en-US'
+@dataclass(frozen=True, slots=True)
+class PlayerSession:
+    """Immutable per-user context for Riot requests
+
+    Built from ``DATABASE.is_data`` (or a temporary login), it is never mutated after creation,
+    so any number of commands and notify workers can use their own sessions concurrently.
+    """
+
+    puuid: str
+    player: str
+    region: str
+    shard: str
+    headers: Mapping[str, str]
+    expires_at: float = float('inf')
+    user_id: int | None = None
 
-    def activate(self, auth: dict[str, Any]) -> None:
-        """activate api"""
+    @classmethod
+    def from_auth(cls, auth: dict[str, Any], user_id: int | None = None, locale_code: str = 'en-US') -> PlayerSession:
+        """Create a session from ``DATABASE.is_data`` or ``Auth.temp_auth`` data"""
 
         try:
-            headers = self.__build_headers(auth['headers'])
-            self.headers = headers
-            # self.cookie = auth['cookie']
-            self.puuid = auth['puuid']
-            self.region = auth['region']
-            self.player = auth['player_name']
-            self.locale_code = auth.get('locale_code', 'en-US')
-            self.__format_region()
-            self.__build_urls()
+            # format region to match from user input
+            region = auth['region']
+            shard = region_shard_override.get(region, region)
+            region = shard_region_override.get(shard, region)
+
+            return cls(
+                puuid=auth['puuid'],
+                player=auth['player_name'],
+                region=region,
+                shard=shard,
+                headers=MappingProxyType(dict(auth['headers'])),
+                expires_at=auth.get('expiry_token') or float('inf'),
+                user_id=user_id,
+            )
         except Exception as e:
             print(e)
-            raise HandshakeError(self.locale_response().get('FAILED_ACTIVE')) from e
+            raise HandshakeError(LocalErrorResponse('API', locale_code).get('FAILED_ACTIVE')) from e
+
+    @property
+    def pd(self) -> str:
+        return base_endpoint.format(shard=self.shard)
+
+    @property
+    def shared(self) -> str:
+        return base_endpoint_shared.format(shard=self.shard)
+
+    @property
+    def glz(self) -> str:
+        return base_endpoint_glz.format(region=self.region, shard=self.shard)
+
+    def is_expired(self) -> bool:
+        """Check if the access token of this session has expired"""
+        return time.time() >= self.expires_at
+
+
+class API_ENDPOINT:  # noqa: PLR0904
+    # Riot answers an expired access token with 400 (BAD_CLAIMS) or 401
+    auth_failed_status = frozenset({400, 401})
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        player: PlayerSession,
+        locale_code: str = 'en-US',
+        refresh: Callable[[PlayerSession], Awaitable[PlayerSession]] | None = None,
+    ) -> None:
+        self.session = session
+
+        # player context, replaced by ``refresh`` when Riot rejects its tokens
+        self.context = player
+        self.refresh = refresh
+
+        # client platform
+        self.client_platform = 'ew0KCSJwbGF0Zm9ybVR5cGUiOiAiUEMiLA0KCSJwbGF0Zm9ybU9TIjogIldpbmRvd3MiLA0KCSJwbGF0Zm9ybU9TVmVyc2lvbiI6ICIxMC4wLjE5MDQyLjEuMjU2LjY0Yml0IiwNCgkicGxhdGZvcm1DaGlwc2V0IjogIlVua25vd24iDQp9'
+
+        # language
+        self.locale_code = locale_code or 'en-US'
+
+    @property
+    def puuid(self) -> str:
+        return self.context.puuid
+
+    @property
+    def player(self) -> str:
+        return self.context.player
+
+    @property
+    def region(self) -> str:
+        return self.context.region
+
+    @property
+    def shard(self) -> str:
+        return self.context.shard
+
+    @property
+    def pd(self) -> str:
+        return self.context.pd
+
+    @property
+    def shared(self) -> str:
+        return self.context.shared
+
+    @property
+    def glz(self) -> str:
+        return self.context.glz
 
     def locale_response(self) -> dict[str, Any]:
         """This function is used to check if the local response is enabled."""
         self.response = LocalErrorResponse('API', self.locale_code)
         return self.response
 
-    # async def refresh_token(self) -> None:
-    # cookies = self.cookie
-    # cookies, accessToken, emt = await self.auth.redeem_cookies(cookies)
-
-    # self.__build_headers()
+    async def __refresh_context(self) -> bool:
+        """Refresh the tokens of the player context once, returns False if it can not be refreshed"""
+        if self.refresh is None or self.context.user_id is None:
+            return False
+        refresh, self.refresh = self.refresh, None  # retry only once
+        self.context = await refresh(self.context)
+        return True
 
-    def fetch(self, endpoint: str = '/', url: str = 'pd', errors: dict[str, Any] | None = None) -> dict[str, Any]:
+    async def fetch(self, endpoint: str = '/', url: str = 'pd', errors: dict[str, Any] | None = None) -> dict[str, Any]:
         """fetch data from the api"""
 
         self.locale_response()
@@ -79,24 +296,32 @@ class API_ENDPOINT:
 
         data = None
 
-        r = requests.get(f'{endpoint_url}{endpoint}', headers=self.headers)
+        headers = await self.__build_headers()
+
+        r = await HTTPClient.get(self.session, f'{endpoint_url}{endpoint}', headers=headers)
+
+        if r.status in self.auth_failed_status and await self.__refresh_context():
+            endpoint_url = getattr(self, url)
+            headers = await self.__build_headers()
+            r = await HTTPClient.get(self.session, f'{endpoint_url}{endpoint}', headers=headers)
 
         try:  # noqa: SIM105
             data = json.loads(r.text)
         except Exception:
             pass
 
-        if 'httpStatus' not in data:  # type: ignore
-            return data  # type: ignore
+        if data is None:
+            raise ResponseError(self.response.get('REQUEST_FAILED'))
 
-        if r.status_code == 400:
+        if r.status < 400 and 'httpStatus' not in data:  # noqa: PLR2004
+            return data  # type: ignore[no-any-return]
+
+        if r.status == 400:
             response = LocalErrorResponse('AUTH', self.locale_code)
             raise ResponseError(response.get('COOKIES_EXPIRED'))
-            # await self.refresh_token()
-            # return await self.fetch(endpoint=endpoint, url=url, errors=errors)
-        return {}
+        raise ResponseError(self.response.get('REQUEST_FAILED'))
 
-    def put(
+    async def put(
         self,
         endpoint: str = '/',
         url: str = 'pd',
@@ -109,7 +334,14 @@ class API_ENDPOINT:
 
         endpoint_url = getattr(self, url)
 
-        r = requests.put(f'{endpoint_url}{endpoint}', headers=self.headers, data=data)
+        headers = await self.__build_headers()
+
+        r = await HTTPClient.request(self.session, 'PUT', f'{endpoint_url}{endpoint}', headers=headers, json=data)
+
+        if r.status in self.auth_failed_status and await self.__refresh_context():
+            endpoint_url = getattr(self, url)
+            headers = await self.__build_headers()
+            r = await HTTPClient.request(self.session, 'PUT', f'{endpoint_url}{endpoint}', headers=headers, json=data)
         data = json.loads(r.text)
 
         if data is None:
@@ -119,34 +351,34 @@ class API_ENDPOINT:
 
     # contracts endpoints
 
-    def fetch_contracts(self) -> dict[str, Any]:
+    async def fetch_contracts(self) -> dict[str, Any]:
         """
         Contracts_Fetch
         Get a list of contracts and completion status including match history
         """
-        return self.fetch(endpoint=f'/contracts/v1/contracts/{self.puuid}', url='pd')
+        return await self.fetch(endpoint=f'/contracts/v1/contracts/{self.puuid}', url='pd')
 
     # PVP endpoints
 
-    def fetch_content(self) -> dict[str, Any]:
+    async def fetch_content(self) -> dict[str, Any]:
         """
         Content_FetchContent
         Get names and ids for game content such as agents, maps, guns, etc.
         """
-        return self.fetch(endpoint='/content-service/v3/content', url='shared')
+        return await self.fetch(endpoint='/content-service/v3/content', url='shared')
 
-    def fetch_account_xp(self) -> dict[str, Any]:
+    async def fetch_account_xp(self) -> dict[str, Any]:
         """
         AccountXP_GetPlayer
         Get the account level, XP, and XP history for the active player
         """
-        return self.fetch(endpoint=f'/account-xp/v1/players/{self.puuid}', url='pd')
+        return await self.fetch(endpoint=f'/account-xp/v1/players/{self.puuid}', url='pd')
 
-    def fetch_player_mmr(self, puuid: str | None = None) -> dict[str, Any]:
+    async def fetch_player_mmr(self, puuid: str | None = None) -> dict[str, Any]:
         puuid = self.__check_puuid(puuid)
-        return self.fetch(endpoint=f'/mmr/v1/players/{puuid}', url='pd')
+        return await self.fetch(endpoint=f'/mmr/v1/players/{puuid}', url='pd')
 
-    def fetch_name_by_puuid(self, puuid: str | None = None) -> dict[str, Any]:
+    async def fetch_name_by_puuid(self, puuid: str | None = None) -> dict[str, Any]:
         """
         Name_service
         get player name tag by puuid
@@ -157,54 +389,63 @@ class API_ENDPOINT:
             puuids = [self.__check_puuid()]
         elif puuid is not None and type(puuid) is str:
             puuids = [puuid]
-        return self.put(endpoint='/name-service/v2/players', url='pd', data=puuids)
+        return await self.put(endpoint='/name-service/v2/players', url='pd', data=puuids)
 
-    def fetch_player_loadout(self) -> dict[str, Any]:
+    async def fetch_player_loadout(self) -> dict[str, Any]:
         """
         playerLoadoutUpdate
         Get the player's current loadout
         """
-        return self.fetch(endpoint=f'/personalization/v2/players/{self.puuid}/playerloadout', url='pd')
+        return await self.fetch(endpoint=f'/personalization/v2/players/{self.puuid}/playerloadout', url='pd')
 
-    def put_player_loadout(self, loadout: dict[str, Any]) -> dict[str, Any]:
+    async def put_player_loadout(self, loadout: dict[str, Any]) -> dict[str, Any]:
         """
         playerLoadoutUpdate
         Use the values from `fetch_player_loadout` excluding properties like `subject` and `version.` Loadout changes take effect when starting a new game
         """
-        return self.put(endpoint=f'/personalization/v2/players/{self.puuid}/playerloadout', url='pd', data=loadout)
+        return await self.put(
+            endpoint=f'/personalization/v2/players/{self.puuid}/playerloadout', url='pd', data=loadout
+        )
 
     # store endpoints
 
-    def store_fetch_offers(self) -> dict[str, Any]:
+    async def store_fetch_offers(self) -> dict[str, Any]:
         """
         Store_GetOffers
         Get prices for all store items
         """
-        return self.fetch('/store/v1/offers/', url='pd')
+        return await self.fetch('/store/v1/offers/', url='pd')
 
-    def store_fetch_storefront(self) -> dict[str, Any]:
+    async def store_fetch_storefront(self, section: str | None = None) -> dict[str, Any]:
         """
         Store_GetStorefrontV2
         Get the currently available items in the store
+        {section}: The storefront section the caller needs (SkinsPanelLayout, BonusStore, FeaturedBundle).
+        A cached storefront is returned until that section rotates.
         """
-        return self.fetch(f'/store/v2/storefront/{self.puuid}', url='pd')
+        data = StorefrontCache.get(self.puuid, section)
+        if data is None:
+            data = await self.fetch(f'/store/v2/storefront/{self.puuid}', url='pd')
+            if data:
+                StorefrontCache.set(self.puuid, data)
+        return data
 
-    def store_fetch_wallet(self) -> dict[str, Any]:
+    async def store_fetch_wallet(self) -> dict[str, Any]:
         """
         Store_GetWallet
         Get amount of Valorant points and Radiant points the player has
         Valorant points have the id 85ad13f7-3d1b-5128-9eb2-7cd8ee0b5741 and Radiant points have the id e59aa87c-4cbf-517a-5983-6e81511be9b7
         """
-        return self.fetch(f'/store/v1/wallet/{self.puuid}', url='pd')
+        return await self.fetch(f'/store/v1/wallet/{self.puuid}', url='pd')
 
-    def store_fetch_order(self, order_id: str) -> dict[str, Any]:
+    async def store_fetch_order(self, order_id: str) -> dict[str, Any]:
         """
         Store_GetOrder
         {order id}: The ID of the order. Can be obtained when creating an order.
         """
-        return self.fetch(f'/store/v1/order/{order_id}', url='pd')
+        return await self.fetch(f'/store/v1/order/{order_id}', url='pd')
 
-    def store_fetch_entitlements(self, item_type: dict) -> dict[str, Any]:
+    async def store_fetch_entitlements(self, item_type: dict) -> dict[str, Any]:
         """
         Store_GetEntitlements
         List what the player owns (agents, skins, buddies, ect.)
@@ -221,81 +462,63 @@ class API_ENDPOINT:
         '3ad1b2b2-acdb-4524-852f-954a76ddae0a': 'Skins chroma',\n
         'de7caa6b-adf7-4588-bbd1-143831e786c6': 'Player titles',\n
         """
-        return self.fetch(endpoint=f'/store/v1/entitlements/{self.puuid}/{item_type}', url='pd')
+        return await self.fetch(endpoint=f'/store/v1/entitlements/{self.puuid}/{item_type}', url='pd')
 
     # useful endpoints
 
-    def fetch_mission(self) -> dict[str, Any]:
+    async def fetch_mission(self) -> dict[str, Any]:
         """
         Get player daily/weekly missions
         """
-        data = self.fetch_contracts()
+        data = await self.fetch_contracts()
         return data['Missions']
 
-    def get_player_level(self) -> dict[str, Any]:
+    async def get_player_level(self) -> dict[str, Any]:
         """
         Aliases `fetch_account_xp` but received a level
         """
-        return self.fetch_account_xp()['Progress']['Level']
+        return (await self.fetch_account_xp())['Progress']['Level']
 
-    def get_player_tier_rank(self, puuid: str | None = None) -> str:
+    async def get_player_tier_rank(self, puuid: str | None = None) -> str:
         """
         get player current tier rank
         """
-        data = self.fetch_player_mmr(puuid)
+        data = await self.fetch_player_mmr(puuid)
         season_id = data['LatestCompetitiveUpdate']['SeasonID']
         if len(season_id) == 0:
-            season_id = self.__get_live_season()
+            season_id = await self.__get_live_season()
         current_season = data['QueueSkills']['competitive']['SeasonalInfoBySeasonID']
         return current_season[season_id]['CompetitiveTier']
 
     # local utility functions
 
-    def __get_live_season(self) -> str:
+    async def __get_live_season(self) -> str:
         """Get the UUID of the live competitive season"""
-        content = self.fetch_content()
+        content = await self.fetch_content()
         season_id = [season['ID'] for season in content['Seasons'] if season['IsActive'] and season['Type'] == 'act']
         if not season_id:
-            return self.fetch_player_mmr()['LatestCompetitiveUpdate']['SeasonID']
+            return (await self.fetch_player_mmr())['LatestCompetitiveUpdate']['SeasonID']
         return season_id[0]
 
     def __check_puuid(self, puuid: str | None = None) -> str:
         """If puuid passed into method is None make it current user's puuid"""
         return self.puuid if puuid is None else puuid
 
-    def __build_urls(self) -> None:
-        """
-        generate URLs based on region/shard
-        """
-        self.pd = base_endpoint.format(shard=self.shard)
-        self.shared = base_endpoint_shared.format(shard=self.shard)
-        self.glz = base_endpoint_glz.format(region=self.region, shard=self.shard)
-
-    def __build_headers(self, headers: dict[str, Any]) -> dict[str, Any]:
+    async def __build_headers(self) -> dict[str, Any]:
         """build headers"""
+        headers = dict(self.context.headers)
         headers['X-Riot-ClientPlatform'] = self.client_platform
-        headers['X-Riot-ClientVersion'] = self._get_client_version()
+        headers['X-Riot-ClientVersion'] = await ClientVersion.get(self.session)
         return headers
 
-    def __format_region(self) -> None:
-        """Format region to match from user input"""
-
-        self.shard = self.region
-        if self.region in region_shard_override:
-            self.shard = region_shard_override[self.region]
-        if self.shard in shard_region_override:
-            self.region = shard_region_override[self.shard]
-
-    def _get_client_version(self) -> str:
+    async def _get_client_version(self) -> str:
         """Get the client version"""
-        r = requests.get('https://valorant-api.com/v1/version')
-        data = r.json()['data']
-        return f'{data["branch"]}-shipping-{data["buildVersion"]}-{data["version"].split(".")[3]}'  # return formatted version string
+        return await ClientVersion.get(self.session)
 
-    def _get_valorant_version(self) -> str | None:
+    async def _get_valorant_version(self) -> str | None:
         """Get the valorant version"""
-        r = requests.get('https://valorant-api.com/v1/version')
-        if r.status_code != 200:
-            return None
-        data = r.json()['data']
-        return data['version']
+        async with self.session.get('https://valorant-api.com/v1/version') as r:
+            if r.status != 200:
+                return None
+            data = (await r.json())['data']
+        return data['version']  # type: ignore[no-any-return]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, ClassVar
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from ..errors import ResponseError
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+
+class Priority(IntEnum):
+    """Priority class of a request, lower is served first"""
+
+    INTERACTIVE = 0  # slash commands, buttons
+    NOTIFY = 1  # daily notify run
+    PREFETCH = 2  # cache reload, token refresh
+
+
+# priority of the requests sent by the current task
+request_priority: ContextVar[Priority] = ContextVar('request_priority', default=Priority.INTERACTIVE)
+
+
+@dataclass(frozen=True, slots=True)
+class Response:
+    """A fully read HTTP response, safe to share between callers"""
+
+    status: int
+    text: str
+    headers: Mapping[str, str]
+
+
+class TokenBucket:
+    """Adaptive token bucket limiting the request rate to one host
+
+    The rate grows back slowly after every successful request and is halved on every 429, so it settles
+    around what the host allows. A ``Retry-After`` blocks the whole bucket until it has passed.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: float = 1.0) -> None:
+        self.max_rate = self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: asyncio.Task[None] | None = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self) -> bool:
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return False
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _delay(self) -> float:
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return max((1 - self.tokens) / self.rate, 0.0)
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to the waiters, by priority then arrival"""
+        while self._waiters:
+            future = self._waiters[0][2]
+            if future.done():  # cancelled caller
+                heapq.heappop(self._waiters)
+            elif self._take():
+                heapq.heappop(self._waiters)
+                future.set_result(None)
+            else:
+                await asyncio.sleep(self._delay())
+
+    def depth(self, priority: Priority) -> int:
+        """Number of callers of a priority waiting for a token"""
+        return sum(1 for level, _, future in self._waiters if level == priority and not future.done())
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """Wait for a token, returns the seconds waited"""
+        if not self._waiters and self._take():
+            return 0.0
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+        return time.monotonic() - started
+
+    def on_success(self) -> None:
+        """Additive increase of the rate"""
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        """Multiplicative decrease of the rate and block the bucket for ``retry_after`` seconds"""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+
+class HTTPClient:
+    """Shared GET client for Riot and valorant-api.com requests
+
+    Concurrent identical GETs (same url and headers, so never across users) are coalesced into a
+    single upstream request whose response is handed to every caller (single-flight).
+
+    Every request first takes a token from the bucket of its host (one per shard for pd/shared/glz),
+    shared by commands and background jobs. Waiting requests get their token by ``request_priority``,
+    so a command is not queued behind a notify run. A 429 is retried after ``Retry-After``.
+    """
+
+    rate = float(os.getenv('RIOT_RATE_LIMIT', '10'))  # requests per second per host
+    burst = float(os.getenv('RIOT_RATE_BURST', '20'))
+    max_retries = 3
+
+    stats: ClassVar[dict[str, int]] = {'requests': 0, 'deduplicated': 0, 'rate_limited': 0}
+
+    # priority name: requests, seconds waited for a token, longest wait
+    waits: ClassVar[dict[str, list[float]]] = {priority.name: [0, 0.0, 0.0] for priority in Priority}
+
+    _buckets: ClassVar[dict[str, TokenBucket]] = {}
+    _inflight: ClassVar[dict[tuple[str, tuple[tuple[str, str], ...]], asyncio.Task[Response]]] = {}
+
+    @classmethod
+    def bucket(cls, url: str) -> TokenBucket:
+        """Get the rate limit bucket of the host of ``url``"""
+        host = urlsplit(url).netloc
+        bucket = cls._buckets.get(host)
+        if bucket is None:
+            bucket = cls._buckets[host] = TokenBucket(cls.rate, cls.burst)
+        return bucket
+
+    @classmethod
+    async def _acquire(cls, bucket: TokenBucket) -> None:
+        priority = request_priority.get()
+        waited = await bucket.acquire(priority)
+        stats = cls.waits[priority.name]
+        stats[0] += 1
+        stats[1] += waited
+        stats[2] = max(stats[2], waited)
+
+    @classmethod
+    def scheduler_report(cls) -> str:
+        """Queue depth and wait times of every priority class"""
+        report = []
+        for priority in Priority:
+            count, total, longest = cls.waits[priority.name]
+            depth = sum(bucket.depth(priority) for bucket in cls._buckets.values())
+            average = total / count if count else 0.0
+            report.append(
+                f'{priority.name.lower()}: {depth} queued, {int(count)} sent, '
+                f'wait avg {average * 1000:.0f}ms max {longest * 1000:.0f}ms'
+            )
+        return ' | '.join(report)
+
+    @staticmethod
+    def retry_after(headers: Mapping[str, str], attempt: int) -> float:
+        """Seconds to wait before retrying a 429, from ``Retry-After`` or exponential backoff"""
+        try:
+            return max(float(headers['Retry-After']), 0.0)
+        except (KeyError, ValueError):
+            return float(2**attempt)
+
+    @classmethod
+    async def request(
+        cls,
+        session: aiohttp.ClientSession,
+        method: str,
+        url: str,
+        total_timeout: float | None = None,
+        **kwargs: Any,
+    ) -> Response:
+        """Send a rate limited request, retrying it on 429"""
+
+        bucket = cls.bucket(url)
+        client_timeout = aiohttp.ClientTimeout(total=total_timeout) if total_timeout is not None else None
+        attempt = 0
+        while True:
+            await cls._acquire(bucket)
+            async with session.request(method, url, timeout=client_timeout, **kwargs) as r:  # type: ignore[arg-type]
+                response = Response(r.status, await r.text(), dict(r.headers))
+
+            if response.status != 429:  # noqa: PLR2004
+                bucket.on_success()
+                return response
+
+            cls.stats['rate_limited'] += 1
+            retry_after = cls.retry_after(response.headers, attempt)
+            bucket.on_rate_limited(retry_after)
+            if attempt >= cls.max_retries:
+                return response
+
+            attempt += 1
+            print(f'Rate limited by {urlsplit(url).netloc}, retry in {retry_after:.1f}s')
+
+    @classmethod
+    async def get(
+        cls,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Mapping[str, str] | None = None,
+        timeout: float | None = None,  # noqa: ASYNC109
+    ) -> Response:
+        """GET ``url``, joining an identical request if one is already in flight"""
+
+        key = (url, tuple(sorted((headers or {}).items())))
+        task = cls._inflight.get(key)
+        if task is None:
+            cls.stats['requests'] += 1
+            task = asyncio.create_task(cls.request(session, 'GET', url, timeout, headers=headers))
+            cls._inflight[key] = task
+            task.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        else:
+            cls.stats['deduplicated'] += 1
+
+        # a cancelled caller must not cancel the request for the others
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def get_json(cls, session: aiohttp.ClientSession, url: str, **kwargs: Any) -> Any:
+        """GET ``url`` and decode its json body, raising for an error status"""
+        r = await cls.get(session, url, **kwargs)
+        if r.status >= 400:  # noqa: PLR2004
+            raise ResponseError(f'GET {url} failed with status {r.status}')  # noqa: TRY003
+        return json.loads(r.text)
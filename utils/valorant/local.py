@@ -4,10 +4,13 @@ I WILL REMOVE THIS FILE AFTER THE LOCALIZATION V2 IS DONE
 
 from __future__ import annotations
 
-import contextlib
 import json
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
 
 # credit by /giorgi-o/
 
@@ -35,31 +38,74 @@ def InteractionLanguage(local_code: str) -> str:
     return Locale.get(str(local_code), 'en-US')
 
 
-def local_read(filename: str) -> dict[str, Any]:
-    path = Path(__file__).parent.parent / 'languages' / f'{filename}.json'
-    if not path.exists():
-        return local_read('en-US')
+def _merge(fallback: Any, value: Any) -> Any:
+    """Deep merge ``value`` over ``fallback``"""
+    if isinstance(fallback, dict) and isinstance(value, dict):
+        return {key: _merge(fallback.get(key), value.get(key)) for key in dict.fromkeys([*fallback, *value])}
+    return fallback if value is None else value
+
+
+def _freeze(value: Any) -> Any:
+    """Make a loaded catalog read-only"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class LocaleCatalog:
+    """Every ``languages/*.json`` catalog, loaded once and kept in memory
+
+    Each catalog is merged over ``en-US`` at load time, so a missing key falls back without any lookup cost.
+    """
+
+    path = Path(__file__).parents[2] / 'languages'
+    default = 'en-US'
+
+    _catalogs: ClassVar[Mapping[str, Mapping[str, Any]] | None] = None
+
+    @classmethod
+    def load(cls) -> int:
+        """(Re)load every catalog from disk, returns the number of loaded locales"""
+
+        raw: dict[str, dict[str, Any]] = {
+            path.stem: json.loads(path.read_text(encoding='utf-8')) for path in cls.path.glob('*.json')
+        }
+        fallback = raw.get(cls.default, {})
+        catalogs = {locale: _freeze(_merge(fallback, data)) for locale, data in raw.items()}
+        cls._catalogs = MappingProxyType(catalogs)
+        return len(catalogs)
+
+    @classmethod
+    def get(cls, locale: str) -> Mapping[str, Any]:
+        """Get the catalog of locale, or the ``en-US`` catalog"""
+        if cls._catalogs is None:
+            cls.load()
+        catalogs: Mapping[str, Mapping[str, Any]] = cls._catalogs  # type: ignore[assignment]
+        return catalogs.get(locale) or catalogs.get(cls.default, MappingProxyType({}))
+
+    @classmethod
+    def section(cls, locale: str, section: str, key: str) -> Mapping[str, Any]:
+        """Get ``catalog[section][key]`` of locale, empty if it does not exist"""
+        return cls.get(locale).get(section, _EMPTY).get(key, _EMPTY)  # type: ignore[no-any-return]
+
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
 
-    data: dict[str, Any] = json.loads(path.read_text(encoding='utf-8'))
-    return data
+def local_read(filename: str) -> Mapping[str, Any]:
+    return LocaleCatalog.get(filename)
 
 
-def ResponseLanguage(command_name: str, local_code: str) -> dict[str, Any]:
-    local_code = __verify_localcode(local_code)
-    local = {}
-    with contextlib.suppress(KeyError):
-        local_dict = local_read(local_code)
-        local = local_dict['commands'][str(command_name)]
-    return local
+def ResponseLanguage(command_name: str, local_code: str) -> Mapping[str, Any]:
+    local_code = __verify_localcode(str(local_code))
+    return LocaleCatalog.section(local_code, 'commands', str(command_name))
 
 
-def LocalErrorResponse(value: str, local_code: str) -> dict[str, Any]:
-    local_code = __verify_localcode(local_code)
-    local = {}
-    with contextlib.suppress(KeyError):
-        local_dict = local_read(local_code)
-        local = local_dict['errors'][value]
-    return local
+def LocalErrorResponse(value: str, local_code: str) -> Mapping[str, Any]:
+    local_code = __verify_localcode(str(local_code))
+    return LocaleCatalog.section(local_code, 'errors', value)
 
 
 def __verify_localcode(local_code: str) -> str:
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from .useful import CacheSnapshot
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+
+
+def normalize(text: str) -> str:
+    """Normalize a name for searching"""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+def trigrams(text: str) -> set[str]:
+    """Get the padded trigrams of a normalized name"""
+    padded = f'  {text} '
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+# ---------- SKIN SEARCH ---------- #
+
+
+class SkinSearch:
+    """Trigram index over the multilingual skin names of one cache version
+
+    Candidates are gathered from the trigram postings and only the best few are scored with
+    ``SequenceMatcher``, so a query never has to compare against every name.
+    """
+
+    candidates = 20
+
+    _index: ClassVar[SkinSearch | None] = None
+    _generation: ClassVar[int | None] = None
+
+    def __init__(self, skins: Mapping[str, dict[str, Any]]) -> None:
+        self.names: dict[str, str] = {}  # normalized name -> skin uuid
+        for uuid, skin in skins.items():
+            for name in skin['names'].values():
+                if name:
+                    self.names.setdefault(normalize(name), uuid)
+
+        self._keys = list(self.names)
+        self._sizes: list[int] = []  # trigram count of each name
+        self._grams: dict[str, list[int]] = {}
+        for key_id, key in enumerate(self._keys):
+            grams = trigrams(key)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(key_id)
+
+    @classmethod
+    def get(cls) -> SkinSearch:
+        """Get the index of the current cache, rebuilt only when the cache snapshot is swapped"""
+        generation = CacheSnapshot.generation()
+        if cls._index is None or generation != cls._generation:
+            cls._index, cls._generation = cls(CacheSnapshot.get().get('skins', {})), generation
+        return cls._index
+
+    def _ranked(self, query: str, cutoff: float) -> Iterator[tuple[float, str]]:
+        grams = trigrams(query)
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+
+        # dice coefficient of the trigram sets, used to shortlist candidates
+        size = len(grams)
+        shortlist = heapq.nlargest(
+            self.candidates, shared, key=lambda key_id: shared[key_id] / (size + self._sizes[key_id])
+        )
+
+        matcher = SequenceMatcher(b=query)
+        for key_id in shortlist:
+            key = self._keys[key_id]
+            matcher.set_seq1(key)
+            score = matcher.ratio()
+            if score >= cutoff:
+                yield score, key
+
+    def search(self, query: str, limit: int = 1, cutoff: float = 0.6) -> list[str]:
+        """Get the uuids of the skins best matching ``query``, best first"""
+
+        query = normalize(query)
+        if not query:
+            return []
+
+        if query in self.names:
+            return [self.names[query]]
+
+        results: list[str] = []
+        for _, key in sorted(self._ranked(query, cutoff), reverse=True):
+            uuid = self.names[key]
+            if uuid not in results:
+                results.append(uuid)
+            if len(results) >= limit:
+                break
+        return results
+
+
+# ---------- AUTOCOMPLETE ---------- #
+
+
+class PrefixIndex:
+    """Word-boundary prefix index over the display names of one cache section in one locale
+
+    Every word suffix of a name is kept in a sorted list, so ``complete`` is a ``bisect`` plus a
+    short scan and "van" matches both "Vandal Prime" and "Prime Vandal".
+    """
+
+    limit = 25  # max choices of a Discord autocomplete
+
+    _indexes: ClassVar[dict[tuple[str, str], PrefixIndex]] = {}
+    _generation: ClassVar[int | None] = None
+
+    def __init__(self, items: Mapping[str, dict[str, Any]], locale: str) -> None:
+        self.names: list[str] = []
+        seen: set[str] = set()
+        entries: list[tuple[str, int]] = []
+        for item in items.values():
+            name = item['names'].get(locale) or item['names'].get('en-US')
+            if not name or name in seen:
+                continue
+            seen.add(name)
+            name_id = len(self.names)
+            self.names.append(name[:100])  # Discord choice name limit
+            words = normalize(name).split()
+            entries.extend((' '.join(words[i:]), name_id) for i in range(len(words)))
+
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._ids = [name_id for _, name_id in entries]
+
+    @classmethod
+    def get(cls, section: str, locale: str) -> PrefixIndex:
+        """Get the index of a cache section (skins, bundles) in locale, rebuilt when the cache snapshot is swapped"""
+        generation = CacheSnapshot.generation()
+        if generation != cls._generation:
+            cls._indexes, cls._generation = {}, generation
+        cache = CacheSnapshot.get()
+
+        index = cls._indexes.get((section, locale))
+        if index is None:
+            index = cls._indexes[section, locale] = cls(cache.get(section, {}), locale)
+        return index
+
+    def complete(self, query: str, limit: int | None = None) -> list[str]:
+        """Get names having a word that starts with ``query``"""
+
+        limit = limit or self.limit
+        query = normalize(query)
+        if not query:
+            return self.names[:limit]
+
+        results: list[str] = []
+        seen: set[int] = set()
+        for position in range(bisect.bisect_left(self._keys, query), len(self._keys)):
+            if not self._keys[position].startswith(query):
+                break
+            name_id = self._ids[position]
+            if name_id not in seen:
+                seen.add(name_id)
+                results.append(self.names[name_id])
+                if len(results) >= limit:
+                    break
+        return results
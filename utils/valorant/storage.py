@@ -0,0 +1,605 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from itertools import islice, starmap
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .useful import JSON
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# ---------- NOTIFY INDEX ---------- #
+
+
+class NotifyIndex:
+    """In-memory inverted index of notify subscriptions
+
+    Maps user -> skin uuids (in subscription order) and skin uuid -> users, so matching a store
+    against a user's notify list, or finding every user who wants a skin, never scans the store.
+    """
+
+    def __init__(self, rows: Iterable[tuple[str, str]] = ()) -> None:
+        self._by_user: dict[str, dict[str, None]] = {}
+        self._by_skin: dict[str, set[str]] = {}
+        for user_id, skin_uuid in rows:
+            self.add(user_id, skin_uuid)
+
+    def add(self, user_id: int | str, skin_uuid: str) -> None:
+        """Add a subscription"""
+        self._by_user.setdefault(str(user_id), {})[skin_uuid] = None
+        self._by_skin.setdefault(skin_uuid, set()).add(str(user_id))
+
+    def remove(self, user_id: int | str, skin_uuid: str) -> None:
+        """Remove a subscription"""
+        skins = self._by_user.get(str(user_id))
+        if skins is not None:
+            skins.pop(skin_uuid, None)
+            if not skins:
+                del self._by_user[str(user_id)]
+        users = self._by_skin.get(skin_uuid)
+        if users is not None:
+            users.discard(str(user_id))
+            if not users:
+                del self._by_skin[skin_uuid]
+
+    def skins_of(self, user_id: int | str) -> list[str]:
+        """Get skin uuids user is subscribed to"""
+        return list(self._by_user.get(str(user_id), ()))
+
+    def users_of(self, skin_uuid: str) -> set[str]:
+        """Get users subscribed to a skin"""
+        return set(self._by_skin.get(skin_uuid, ()))
+
+    def match(self, user_id: int | str, skin_uuids: Iterable[str]) -> list[str]:
+        """Get the skins in ``skin_uuids`` that user is subscribed to"""
+        skins = self._by_user.get(str(user_id))
+        if not skins:
+            return []
+        return [uuid for uuid in skin_uuids if uuid in skins]
+
+
+# ---------- STORAGE ENGINES ---------- #
+
+
+class BaseStorage(ABC):
+    """Storage engine used by ``DATABASE`` for accounts and notify subscriptions
+
+    Every method works on a single user/row, so a mutation never has to rewrite the whole database.
+    Notify mutations go through ``add_notify``/``remove_notify``, which keep ``notify_index`` in sync.
+    """
+
+    _notify_index: NotifyIndex | None = None
+
+    @abstractmethod
+    def get_user(self, user_id: int | str) -> dict[str, Any] | None:
+        """Get user data"""
+
+    @abstractmethod
+    def set_user(self, user_id: int | str, data: dict[str, Any]) -> None:
+        """Insert or replace user data"""
+
+    @abstractmethod
+    def delete_user(self, user_id: int | str) -> bool:
+        """Delete user, returns False if the user does not exist"""
+
+    @abstractmethod
+    def iter_users(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Iterate over all users"""
+
+    @abstractmethod
+    def get_notify_users(self) -> list[str]:
+        """Get ids of users whose notify mode is on"""
+
+    @abstractmethod
+    def get_expiring_users(self, before: float, now: float) -> list[tuple[str, bool, float]]:
+        """Get ``(user_id, notify on, expiry)`` of users whose token expires before ``before``, but not in backoff"""
+
+    @property
+    def notify_index(self) -> NotifyIndex:
+        """Inverted index of notify subscriptions, built from the store on first use"""
+        if self._notify_index is None:
+            self._notify_index = NotifyIndex(self.iter_notifys())
+        return self._notify_index
+
+    def add_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        """Add skin to user notify list, returns False if it is already in the list"""
+        added = self._insert_notify(user_id, skin_uuid)
+        if added and self._notify_index is not None:
+            self._notify_index.add(user_id, skin_uuid)
+        return added
+
+    def remove_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        """Remove skin from user notify list, returns False if it is not in the list"""
+        removed = self._delete_notify(user_id, skin_uuid)
+        if removed and self._notify_index is not None:
+            self._notify_index.remove(user_id, skin_uuid)
+        return removed
+
+    @abstractmethod
+    def _insert_notify(self, user_id: int | str, skin_uuid: str) -> bool: ...
+
+    @abstractmethod
+    def _delete_notify(self, user_id: int | str, skin_uuid: str) -> bool: ...
+
+    @abstractmethod
+    def iter_notifys(self) -> Iterator[tuple[str, str]]:
+        """Iterate over all ``(user_id, skin_uuid)`` notify rows"""
+
+    # ---------- NOTIFY RUN JOURNAL ---------- #
+
+    @abstractmethod
+    def create_notify_run(self, run_id: str, user_ids: Iterable[int | str]) -> bool:
+        """Journal a notify run with every user pending, returns False if the run already exists"""
+
+    @abstractmethod
+    def get_notify_run(self, run_id: str, user_id: int | str | None = None) -> dict[str, tuple[str, int]]:
+        """Get ``{user_id: (status, attempts)}`` of a notify run (only of ``user_id`` if given), empty if it does not exist"""
+
+    @abstractmethod
+    def set_notify_status(self, run_id: str, user_ids: Iterable[int | str], status: str, attempt: bool = False) -> None:
+        """Set the status of users in a notify run, counting an attempt if ``attempt``"""
+
+    @abstractmethod
+    def delete_notify_runs(self, keep: str) -> None:
+        """Delete the journal and retries of every notify run but ``keep``"""
+
+    # ---------- NOTIFY RETRY QUEUE ---------- #
+
+    @abstractmethod
+    def push_notify_retry(self, run_id: str, user_id: int | str, retry_at: float, error: str) -> None:
+        """Queue a failed notification to be retried at ``retry_at`` (unix time), marking it 'retry'"""
+
+    @abstractmethod
+    def pop_notify_retries(self, before: float) -> list[tuple[str, str]]:
+        """Take the ``(run_id, user_id)`` retries due before ``before``, marking them pending again"""
+
+    @abstractmethod
+    def add_notify_dead_letter(self, run_id: str, user_id: int | str, attempts: int, error: str) -> None:
+        """Give up on a notification, keeping it with its last error, marking it 'dead'"""
+
+    # ---------- META ---------- #
+
+    @abstractmethod
+    def get_meta(self, key: str) -> str | None:
+        """Get a value of the storage metadata"""
+
+    @abstractmethod
+    def set_meta(self, key: str, value: str) -> None:
+        """Set a value of the storage metadata"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the storage"""
+
+
+class JSONStorage(BaseStorage):
+    """Legacy storage on ``data/users.json`` and ``data/notifys.json``"""
+
+    def __init__(self, prefix: str = '') -> None:
+        # names of the json files in data/, ``prefix`` keeps several stores apart
+        self.users = f'{prefix}users'
+        self.notifys = f'{prefix}notifys'
+        self.runs = f'{prefix}notify_runs'
+        self.retries = f'{prefix}notify_retries'
+        self.dead_letters = f'{prefix}notify_dead_letters'
+        self.meta = f'{prefix}meta'
+
+    def _read_notifys(self) -> list[dict[str, str]]:
+        data = JSON.read(self.notifys)
+        return data if isinstance(data, list) else []
+
+    def get_user(self, user_id: int | str) -> dict[str, Any] | None:
+        return JSON.read(self.users).get(str(user_id))
+
+    def set_user(self, user_id: int | str, data: dict[str, Any]) -> None:
+        db = JSON.read(self.users)
+        db[str(user_id)] = data
+        JSON.save(self.users, db)
+
+    def delete_user(self, user_id: int | str) -> bool:
+        db = JSON.read(self.users)
+        if db.pop(str(user_id), None) is None:
+            return False
+        JSON.save(self.users, db)
+        return True
+
+    def iter_users(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        yield from JSON.read(self.users).items()
+
+    def get_notify_users(self) -> list[str]:
+        db = JSON.read(self.users)
+        return [user_id for user_id in db if db[user_id].get('notify_mode') is not None]
+
+    def get_expiring_users(self, before: float, now: float) -> list[tuple[str, bool, float]]:
+        return [
+            (user_id, data.get('notify_mode') is not None, data.get('expiry_token', 0))
+            for user_id, data in JSON.read(self.users).items()
+            if data.get('expiry_token', 0) < before and (data.get('refresh_after') or 0) <= now
+        ]
+
+    def _insert_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        data = self._read_notifys()
+        payload = {'id': str(user_id), 'uuid': skin_uuid}
+        if payload in data:
+            return False
+        data.append(payload)
+        JSON.save(self.notifys, data)  # type: ignore[arg-type]
+        return True
+
+    def _delete_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        data = self._read_notifys()
+        payload = {'id': str(user_id), 'uuid': skin_uuid}
+        if payload not in data:
+            return False
+        data.remove(payload)
+        JSON.save(self.notifys, data)  # type: ignore[arg-type]
+        return True
+
+    def iter_notifys(self) -> Iterator[tuple[str, str]]:
+        for x in self._read_notifys():
+            yield x['id'], x['uuid']
+
+    def create_notify_run(self, run_id: str, user_ids: Iterable[int | str]) -> bool:
+        runs = JSON.read(self.runs)
+        if run_id in runs:
+            return False
+        runs[run_id] = {str(user_id): ['pending', 0] for user_id in user_ids}
+        JSON.save(self.runs, runs)
+        return True
+
+    def get_notify_run(self, run_id: str, user_id: int | str | None = None) -> dict[str, tuple[str, int]]:
+        run = JSON.read(self.runs).get(run_id, {})
+        if user_id is not None:
+            run = {str(user_id): run[str(user_id)]} if str(user_id) in run else {}
+        return {user_id: (status, attempts) for user_id, (status, attempts) in run.items()}
+
+    def set_notify_status(self, run_id: str, user_ids: Iterable[int | str], status: str, attempt: bool = False) -> None:
+        runs = JSON.read(self.runs)
+        run = runs.setdefault(run_id, {})
+        for user_id in user_ids:
+            entry = run.setdefault(str(user_id), ['pending', 0])
+            entry[0] = status
+            entry[1] += int(attempt)
+        JSON.save(self.runs, runs)
+
+    def delete_notify_runs(self, keep: str) -> None:
+        runs = JSON.read(self.runs)
+        JSON.save(self.runs, {run_id: run for run_id, run in runs.items() if run_id == keep})
+        retries = JSON.read(self.retries)
+        JSON.save(self.retries, {key: retry for key, retry in retries.items() if retry['run_id'] == keep})
+
+    def push_notify_retry(self, run_id: str, user_id: int | str, retry_at: float, error: str) -> None:
+        retries = JSON.read(self.retries)
+        retries[f'{run_id}:{user_id}'] = {
+            'run_id': run_id,
+            'user_id': str(user_id),
+            'retry_at': retry_at,
+            'error': error,
+        }
+        JSON.save(self.retries, retries)
+        self.set_notify_status(run_id, [user_id], 'retry')
+
+    def pop_notify_retries(self, before: float) -> list[tuple[str, str]]:
+        retries = JSON.read(self.retries)
+        due = [key for key, retry in retries.items() if retry['retry_at'] <= before]
+        if not due:
+            return []
+        popped = [(retries[key]['run_id'], retries.pop(key)['user_id']) for key in due]
+        JSON.save(self.retries, retries)
+        for run_id, user_id in popped:
+            self.set_notify_status(run_id, [user_id], 'pending')
+        return popped
+
+    def add_notify_dead_letter(self, run_id: str, user_id: int | str, attempts: int, error: str) -> None:
+        dead_letters = JSON.read(self.dead_letters)
+        dead_letters[f'{run_id}:{user_id}'] = {
+            'run_id': run_id,
+            'user_id': str(user_id),
+            'attempts': attempts,
+            'error': error,
+            'created_at': time.time(),
+        }
+        JSON.save(self.dead_letters, dead_letters)
+        self.set_notify_status(run_id, [user_id], 'dead')
+
+    def get_meta(self, key: str) -> str | None:
+        return JSON.read(self.meta).get(key)
+
+    def set_meta(self, key: str, value: str) -> None:
+        meta = JSON.read(self.meta)
+        meta[key] = value
+        JSON.save(self.meta, meta)
+
+    def close(self) -> None:
+        pass  # every call opens and closes its files
+
+
+class SQLiteStorage(BaseStorage):
+    """SQLite storage (WAL mode) on ``data/valorant.db``"""
+
+    _schema = """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        notify_mode TEXT,
+        data TEXT NOT NULL,
+        expiry_token REAL,
+        refresh_after REAL
+    );
+    CREATE INDEX IF NOT EXISTS users_notify_mode ON users (notify_mode);
+
+    CREATE TABLE IF NOT EXISTS notifys (
+        user_id INTEGER NOT NULL,
+        skin_uuid TEXT NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS notifys_user_skin ON notifys (user_id, skin_uuid);
+
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS notify_runs (
+        run_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (run_id, user_id)
+    );
+
+    CREATE TABLE IF NOT EXISTS notify_retries (
+        run_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        retry_at REAL NOT NULL,
+        error TEXT,
+        PRIMARY KEY (run_id, user_id)
+    );
+    CREATE INDEX IF NOT EXISTS notify_retries_retry_at ON notify_retries (retry_at);
+
+    CREATE TABLE IF NOT EXISTS notify_dead_letters (
+        run_id TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        attempts INTEGER NOT NULL,
+        error TEXT,
+        created_at REAL NOT NULL,
+        PRIMARY KEY (run_id, user_id)
+    );
+    """
+
+    def __init__(self, path: str = 'data/valorant.db') -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self._schema)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Add the columns of newer versions to an existing database"""
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(users)')}
+        if 'expiry_token' not in columns:
+            with self.conn:
+                self.conn.execute('BEGIN')
+                self.conn.execute('ALTER TABLE users ADD COLUMN expiry_token REAL')
+                self.conn.execute('ALTER TABLE users ADD COLUMN refresh_after REAL')
+                self.conn.execute(
+                    "UPDATE users SET expiry_token = json_extract(data, '$.expiry_token'), "
+                    "refresh_after = json_extract(data, '$.refresh_after')"
+                )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS users_expiry_token ON users (expiry_token)')
+
+    @staticmethod
+    def user_row(user_id: int | str, data: dict[str, Any]) -> tuple[Any, ...]:
+        """Row of the users table, the indexed columns are copied out of the json data"""
+        return (
+            int(user_id),
+            data.get('notify_mode'),
+            json.dumps(data, ensure_ascii=False),
+            data.get('expiry_token'),
+            data.get('refresh_after'),
+        )
+
+    def get_user(self, user_id: int | str) -> dict[str, Any] | None:
+        row = self.conn.execute('SELECT data FROM users WHERE user_id = ?', (int(user_id),)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0])  # type: ignore[no-any-return]
+
+    def set_user(self, user_id: int | str, data: dict[str, Any]) -> None:
+        self.conn.execute(
+            'INSERT OR REPLACE INTO users (user_id, notify_mode, data, expiry_token, refresh_after) '
+            'VALUES (?, ?, ?, ?, ?)',
+            self.user_row(user_id, data),
+        )
+
+    def delete_user(self, user_id: int | str) -> bool:
+        cursor = self.conn.execute('DELETE FROM users WHERE user_id = ?', (int(user_id),))
+        return cursor.rowcount > 0
+
+    def iter_users(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        for user_id, data in self.conn.execute('SELECT user_id, data FROM users'):
+            yield str(user_id), json.loads(data)
+
+    def get_notify_users(self) -> list[str]:
+        rows = self.conn.execute('SELECT user_id FROM users WHERE notify_mode IS NOT NULL').fetchall()
+        return [str(row[0]) for row in rows]
+
+    def get_expiring_users(self, before: float, now: float) -> list[tuple[str, bool, float]]:
+        rows = self.conn.execute(
+            'SELECT user_id, notify_mode IS NOT NULL, expiry_token FROM users '
+            'WHERE expiry_token < ? AND (refresh_after IS NULL OR refresh_after <= ?)',
+            (before, now),
+        ).fetchall()
+        return [(str(user_id), bool(notify), expiry) for user_id, notify, expiry in rows]
+
+    def _insert_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        cursor = self.conn.execute(
+            'INSERT OR IGNORE INTO notifys (user_id, skin_uuid) VALUES (?, ?)', (int(user_id), skin_uuid)
+        )
+        return cursor.rowcount > 0
+
+    def _delete_notify(self, user_id: int | str, skin_uuid: str) -> bool:
+        cursor = self.conn.execute('DELETE FROM notifys WHERE user_id = ? AND skin_uuid = ?', (int(user_id), skin_uuid))
+        return cursor.rowcount > 0
+
+    def iter_notifys(self) -> Iterator[tuple[str, str]]:
+        for user_id, skin_uuid in self.conn.execute('SELECT user_id, skin_uuid FROM notifys'):
+            yield str(user_id), skin_uuid
+
+    def create_notify_run(self, run_id: str, user_ids: Iterable[int | str]) -> bool:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            if self.conn.execute('SELECT 1 FROM notify_runs WHERE run_id = ? LIMIT 1', (run_id,)).fetchone():
+                return False
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO notify_runs (run_id, user_id) VALUES (?, ?)',
+                ((run_id, int(user_id)) for user_id in user_ids),
+            )
+        return True
+
+    def get_notify_run(self, run_id: str, user_id: int | str | None = None) -> dict[str, tuple[str, int]]:
+        if user_id is None:
+            rows = self.conn.execute('SELECT user_id, status, attempts FROM notify_runs WHERE run_id = ?', (run_id,))
+        else:
+            rows = self.conn.execute(
+                'SELECT user_id, status, attempts FROM notify_runs WHERE run_id = ? AND user_id = ?',
+                (run_id, int(user_id)),
+            )
+        return {str(user_id): (status, attempts) for user_id, status, attempts in rows}
+
+    def set_notify_status(self, run_id: str, user_ids: Iterable[int | str], status: str, attempt: bool = False) -> None:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.executemany(
+                'INSERT INTO notify_runs (run_id, user_id, status, attempts) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (run_id, user_id) DO UPDATE SET status = excluded.status, '
+                'attempts = attempts + excluded.attempts',
+                ((run_id, int(user_id), status, int(attempt)) for user_id in user_ids),
+            )
+
+    def delete_notify_runs(self, keep: str) -> None:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.execute('DELETE FROM notify_runs WHERE run_id != ?', (keep,))
+            self.conn.execute('DELETE FROM notify_retries WHERE run_id != ?', (keep,))
+
+    def push_notify_retry(self, run_id: str, user_id: int | str, retry_at: float, error: str) -> None:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                'INSERT OR REPLACE INTO notify_retries (run_id, user_id, retry_at, error) VALUES (?, ?, ?, ?)',
+                (run_id, int(user_id), retry_at, error),
+            )
+            self.conn.execute(
+                "UPDATE notify_runs SET status = 'retry' WHERE run_id = ? AND user_id = ?", (run_id, int(user_id))
+            )
+
+    def pop_notify_retries(self, before: float) -> list[tuple[str, str]]:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            rows = self.conn.execute(
+                'SELECT run_id, user_id FROM notify_retries WHERE retry_at <= ?', (before,)
+            ).fetchall()
+            self.conn.executemany('DELETE FROM notify_retries WHERE run_id = ? AND user_id = ?', rows)
+            self.conn.executemany("UPDATE notify_runs SET status = 'pending' WHERE run_id = ? AND user_id = ?", rows)
+        return [(run_id, str(user_id)) for run_id, user_id in rows]
+
+    def add_notify_dead_letter(self, run_id: str, user_id: int | str, attempts: int, error: str) -> None:
+        with self.conn:
+            self.conn.execute('BEGIN')
+            self.conn.execute(
+                'INSERT OR REPLACE INTO notify_dead_letters (run_id, user_id, attempts, error, created_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (run_id, int(user_id), attempts, error, time.time()),
+            )
+            self.conn.execute(
+                "UPDATE notify_runs SET status = 'dead' WHERE run_id = ? AND user_id = ?", (run_id, int(user_id))
+            )
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# ---------- MIGRATION ---------- #
+
+
+def _chunked(iterable: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def migrate_json_to_sqlite(storage: SQLiteStorage, chunk_size: int = 1000) -> None:
+    """One-shot migration of ``users.json`` and ``notifys.json`` into SQLite
+
+    Rows are streamed into the database in chunks, each chunk in its own transaction.
+    The JSON files are left untouched so the migration can be verified or rolled back.
+    """
+
+    if storage.get_meta('json_migrated') is not None:
+        return
+
+    legacy = JSONStorage()
+
+    if Path(f'data/{legacy.users}.json').exists():
+        print('Migrating users.json to SQLite !')
+        users = starmap(storage.user_row, legacy.iter_users())
+        for chunk in _chunked(users, chunk_size):
+            with storage.conn:
+                storage.conn.execute('BEGIN')
+                storage.conn.executemany(
+                    'INSERT OR IGNORE INTO users (user_id, notify_mode, data, expiry_token, refresh_after) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    chunk,
+                )
+
+    if Path(f'data/{legacy.notifys}.json').exists():
+        print('Migrating notifys.json to SQLite !')
+        notifys = ((int(user_id), skin_uuid) for user_id, skin_uuid in legacy.iter_notifys())
+        for chunk in _chunked(notifys, chunk_size):
+            with storage.conn:
+                storage.conn.execute('BEGIN')
+                storage.conn.executemany('INSERT OR IGNORE INTO notifys (user_id, skin_uuid) VALUES (?, ?)', chunk)
+
+    storage.set_meta('json_migrated', '1')
+
+
+# ---------- STORAGE ---------- #
+
+_storage: BaseStorage | None = None
+
+
+def get_storage() -> BaseStorage:
+    """Get the process-wide storage engine, selected by the ``DATABASE_ENGINE`` env (sqlite/json)"""
+
+    global _storage  # noqa: PLW0603
+    if _storage is None:
+        engine = os.getenv('DATABASE_ENGINE', 'sqlite').lower()
+        if engine == 'json':
+            _storage = JSONStorage()
+        else:
+            storage = SQLiteStorage()
+            migrate_json_to_sqlite(storage)
+            _storage = storage
+    return _storage
+
+
+def close_storage() -> None:
+    """Close the process-wide storage engine if it was opened"""
+
+    global _storage  # noqa: PLW0603
+    if _storage is not None:
+        _storage.close()
+        _storage = None
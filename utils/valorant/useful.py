@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import contextlib
 import json
 import os
+import time
 import uuid
 from datetime import UTC, datetime
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import discord
@@ -16,6 +19,8 @@ from .resources import get_item_type, points as points_emoji, tiers as tiers_res
 VLR_locale = ValorantTranslator()
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
     from bot import ValorantBot
 
 current_season_id = '99ac9283-4dd3-5248-2e01-8baf778affb4'
@@ -117,15 +122,171 @@ class JSON:
     @staticmethod
     def save(filename: str, data: dict[str, Any]) -> None:
         """Save data to json file"""
+        file_path = 'data/' + filename + '.json'
         try:
-            with open('data/' + filename + '.json', 'w', encoding='utf-8') as json_file:
+            # write next to the file and rename over it, readers never see a half-written file
+            tmp_path = Path(file_path + '.tmp')
+            with tmp_path.open('w', encoding='utf-8') as json_file:
                 json.dump(data, json_file, indent=2, ensure_ascii=False)
+            tmp_path.replace(file_path)
         except (FileNotFoundError, KeyError):
             from .cache import create_json
 
             create_json(filename, {})
             return JSON.save(filename, data)
 
+        if filename == 'cache':
+            CacheSnapshot.swap(data)
+        return None
+
+
+class CacheSnapshot:
+    """Shared in-memory snapshot of ``data/cache.json``
+
+    The static cache is loaded from disk once and then served to every lookup from memory.
+    The snapshot is replaced as a whole (never mutated) whenever a new cache is saved, or when
+    ``revalidate`` notices that the file on disk has changed. Callers must treat the returned
+    dict as read-only; use ``JSON.read('cache')`` to get a private copy for editing.
+    """
+
+    _path = 'data/cache.json'
+    _data: dict[str, Any] | None = None
+    _stamp: tuple[int, int] | None = None
+    _generation: int = 0  # bumped on every swap, lets derived indexes notice any reload
+
+    @classmethod
+    def _file_stamp(cls) -> tuple[int, int] | None:
+        try:
+            stat = Path(cls._path).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @classmethod
+    def get(cls) -> dict[str, Any]:
+        """Get the current cache snapshot, loading it from disk on first use"""
+        data = cls._data
+        if data is None:
+            data = cls.load()
+        return data
+
+    @classmethod
+    def load(cls) -> dict[str, Any]:
+        """Load the cache from disk and swap it in"""
+        stamp = cls._file_stamp()
+        data = JSON.read('cache')
+        cls._data, cls._stamp = data, stamp
+        cls._generation += 1
+        return data
+
+    @classmethod
+    def swap(cls, data: dict[str, Any]) -> None:
+        """Replace the snapshot with a freshly written cache"""
+        cls._data, cls._stamp = data, cls._file_stamp()
+        cls._generation += 1
+
+    @classmethod
+    def revalidate(cls) -> bool:
+        """Reload the snapshot if the cache file changed on disk, returns True if it was reloaded"""
+        if cls._data is not None and cls._file_stamp() == cls._stamp:
+            return False
+        cls.load()
+        return True
+
+    @classmethod
+    def version(cls) -> str | None:
+        """Get the valorant version of the current snapshot"""
+        return cls.get().get('valorant_version')
+
+    @classmethod
+    def generation(cls) -> int:
+        """Get the generation of the current snapshot, which changes whenever it is swapped"""
+        cls.get()
+        return cls._generation
+
+
+class PriceTable:
+    """Skin prices shared by every user, kept in memory and in ``data/prices.json``
+
+    Prices are global, so the offers are fetched with whichever session asks first and then at most
+    once per ``PRICE_REFRESH_INTERVAL`` seconds. A stale table keeps serving lookups while it is
+    refreshed in the background.
+    """
+
+    ttl = int(os.getenv('PRICE_REFRESH_INTERVAL', str(6 * 60 * 60)))  # 6 hours
+
+    _prices: dict[str, int] | None = None
+    _updated_at: float = 0.0
+    _task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def load(cls) -> dict[str, int]:
+        """Load the price table from disk"""
+        data = JSON.read('prices')
+        prices = data.get('prices')
+        if prices is None:
+            # prices used to live in cache.json, keep serving them until the first refresh
+            prices = {k: v for k, v in CacheSnapshot.get().get('prices', {}).items() if k != 'is_price'}
+        cls._prices = prices
+        cls._updated_at = data.get('updated_at', 0.0)
+        return prices
+
+    @classmethod
+    def prices(cls) -> dict[str, int]:
+        """Get the price table, loading it from disk on first use"""
+        prices = cls._prices
+        if prices is None:
+            prices = cls.load()
+        return prices
+
+    @classmethod
+    def get(cls, uuid: str) -> int | None:
+        """Get the price of a skin"""
+        return cls.prices().get(uuid)
+
+    @classmethod
+    def is_stale(cls) -> bool:
+        """Check if the table is empty or older than the refresh interval"""
+        return not cls.prices() or time.time() - cls._updated_at > cls.ttl
+
+    @classmethod
+    def update(cls, offers: dict[str, Any]) -> None:
+        """Replace the table with the prices of a ``Store_GetOffers`` payload"""
+        skins = CacheSnapshot.get().get('skins', {})
+        prices = {}
+        for offer in offers['Offers']:
+            if offer['OfferID'] in skins:
+                (*cost,) = offer['Cost'].values()
+                prices[offer['OfferID']] = cost[0]
+
+        cls._prices, cls._updated_at = prices, time.time()
+        JSON.save('prices', {'updated_at': cls._updated_at, 'prices': prices})  # type: ignore[dict-item]
+
+    @classmethod
+    async def _refresh(cls, fetch_offers: Callable[[], Awaitable[dict[str, Any]]]) -> None:
+        offers = await fetch_offers()
+        if offers.get('Offers'):
+            cls.update(offers)
+
+    @staticmethod
+    def _on_refreshed(task: asyncio.Task[None]) -> None:
+        if not task.cancelled() and (e := task.exception()) is not None:
+            print(f'Failed to refresh skin prices: {e}')
+
+    @classmethod
+    async def refresh(cls, fetch_offers: Callable[[], Awaitable[dict[str, Any]]], force: bool = False) -> None:
+        """Refresh the table with ``fetch_offers`` if it is stale
+
+        Waits for the refresh only when there is no price yet (or ``force``), otherwise it runs in the background.
+        """
+        if not force and not cls.is_stale():
+            return
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._refresh(fetch_offers))
+            cls._task.add_done_callback(cls._on_refreshed)
+        if force or not cls.prices():
+            await asyncio.shield(cls._task)
+
 
 # ---------- GET DATA ---------- #
 
@@ -158,7 +319,7 @@ class GetItems:
     def get_skin(uuid: str) -> dict[str, Any]:
         """Get Skin data"""
         try:
-            skin_data = JSON.read('cache')
+            skin_data = CacheSnapshot.get()
             skin = skin_data['skins'][uuid]
         except KeyError as e:
             raise ValorantBotError('Some skin data is missing, plz use `/debug cache`') from e  # noqa: TRY003
@@ -168,19 +329,16 @@ class GetItems:
     def get_skin_price(uuid: str) -> str:
         """Get Skin price by skin uuid"""
 
-        data = JSON.read('cache')
-        price = data['prices']
-        try:
-            cost = price[uuid]
-        except Exception:
-            cost = '-'
-        return cost  # type: ignore[no-any-return]
+        cost = PriceTable.get(uuid)
+        if cost is None:
+            return '-'
+        return cost  # type: ignore[return-value]
 
     @staticmethod
     def get_skin_tier_icon(skin: str) -> str:
         """Get Skin skin tier image"""
 
-        skindata = JSON.read('cache')
+        skindata = CacheSnapshot.get()
         tier_uuid = skindata['skins'][skin]['tier']
         return skindata['tiers'][tier_uuid]['icon']
 
@@ -188,7 +346,7 @@ class GetItems:
     def get_spray(uuid: str) -> Any:
         """Get Spray"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         spray = None
         with contextlib.suppress(Exception):
             spray = data['sprays'][uuid]
@@ -198,7 +356,7 @@ class GetItems:
     def get_title(uuid: str) -> Any:
         """Get Title"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         title = None
         with contextlib.suppress(Exception):
             title = data['titles'][uuid]
@@ -208,7 +366,7 @@ class GetItems:
     def get_playercard(uuid: str) -> Any:
         """Get Player card"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         title = None
         with contextlib.suppress(Exception):
             title = data['playercards'][uuid]
@@ -218,7 +376,7 @@ class GetItems:
     def get_buddie(uuid: str) -> Any:
         """Get Buddie"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         title = None
         with contextlib.suppress(Exception):
             title = data['buddies'][uuid]
@@ -228,7 +386,7 @@ class GetItems:
     def get_skin_lvl_or_name(name: str, uuid: str) -> Any:
         """Get Skin uuid by name"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         skin = None
         with contextlib.suppress(Exception):
             skin = data['skins'][uuid]
@@ -242,7 +400,7 @@ class GetItems:
         """Get tier name by skin uuid"""
 
         try:
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             uuid = data['skins'][skin_uuid]['tier']
             name = data['tiers'][uuid]['name']
         except KeyError as e:
@@ -253,7 +411,7 @@ class GetItems:
     def get_contract(uuid: str) -> Any:
         """Get contract by uuid"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         contract = None
         with contextlib.suppress(Exception):
             contract = data['contracts'][uuid]
@@ -263,7 +421,7 @@ class GetItems:
     def get_bundle(uuid: str) -> Any:
         """Get bundle by uuid"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         bundle = None
         with contextlib.suppress(Exception):
             bundle = data['bundles'][uuid]
@@ -278,7 +436,7 @@ class GetEmoji:
     def tier(skin_uuid: str) -> discord.Emoji:
         """Get tier emoji"""
 
-        data = JSON.read('cache')
+        data = CacheSnapshot.get()
         uuid = data['skins'][skin_uuid]['tier']
         uuid = data['tiers'][uuid]['uuid']
         return tiers_resources[uuid]['emoji']
@@ -351,7 +509,7 @@ class GetFormat:
             weekly_end = ''
 
         def get_mission_by_id(ID: str) -> str | None:
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             return data['missions'][ID]
 
         for m in mission:
@@ -420,41 +578,41 @@ class GetFormat:
         """Get item battle pass by type and uuid"""
 
         if type == 'Currency':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['currencies'][uuid]['names'][str(VLR_locale)]
             icon = data['currencies'][uuid]['icon']
             item_type = response.get('POINT', 'Point')
             return {'success': True, 'data': {'type': item_type, 'name': '10 ' + name, 'icon': icon}}
 
         if type == 'PlayerCard':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['playercards'][uuid]['names'][str(VLR_locale)]
             icon = data['playercards'][uuid]['icon']['wide']
             item_type = response.get('PLAYER_CARD', 'Player Card')
             return {'success': True, 'data': {'type': item_type, 'name': name, 'icon': icon}}
 
         if type == 'Title':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['titles'][uuid]['names'][str(VLR_locale)]
             item_type = response.get('PLAYER_TITLE', 'Title')
             return {'success': True, 'data': {'type': item_type, 'name': name, 'icon': False}}
 
         if type == 'Spray':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['sprays'][uuid]['names'][str(VLR_locale)]
             icon = data['sprays'][uuid]['icon']
             item_type = response.get('SPRAY', 'Spray')
             return {'success': True, 'data': {'type': item_type, 'name': name, 'icon': icon}}
 
         if type == 'EquippableSkinLevel':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['skins'][uuid]['names'][str(VLR_locale)]
             icon = data['skins'][uuid]['icon']
             item_type = response.get('SKIN', 'Skin')
             return {'success': True, 'data': {'type': item_type, 'name': name, 'icon': icon}}
 
         if type == 'EquippableCharmLevel':
-            data = JSON.read('cache')
+            data = CacheSnapshot.get()
             name = data['buddies'][uuid]['names'][str(VLR_locale)]
             icon = data['buddies'][uuid]['icon']
             item_type = response.get('BUDDY', 'Buddie')
@@ -506,7 +664,7 @@ class GetFormat:
         """Get battle pass format"""
 
         data = data['Contracts']
-        contracts = JSON.read('cache')
+        contracts = CacheSnapshot.get()
         # data_contracts['contracts'].pop('version')
 
         season_id = season['id']  # type: ignore
@@ -13,10 +13,11 @@ from discord import ButtonStyle, Interaction, TextStyle, ui
 
 from ..errors import ValorantBotError
 from ..locale_v2 import ValorantTranslator
+from .auth import Auth
 from .resources import get_item_type
 
 # Local
-from .useful import JSON, GetEmoji, GetItems, format_relative
+from .useful import GetEmoji, GetItems, format_relative
 
 VLR_locale = ValorantTranslator()
 
@@ -43,7 +44,8 @@ class share_button(ui.View):
 
 
 class NotifyView(discord.ui.View):
-    def __init__(self, user_id: int, uuid: str, name: str, response: dict) -> None:
+    def __init__(self, db: DATABASE, user_id: int, uuid: str, name: str, response: dict) -> None:
+        self.db = db
         self.user_id = user_id
         self.uuid = uuid
         self.name = name
@@ -68,14 +70,7 @@ class NotifyView(discord.ui.View):
 
     @discord.ui.button(label='Remove Notify', emoji='✖️', style=ButtonStyle.red)
     async def remove_notify(self, interaction: Interaction, button: ui.Button) -> None:
-        data = JSON.read('notifys')
-
-        for i in range(len(data)):
-            if data[i]['uuid'] == self.uuid and data[i]['id'] == str(self.user_id):  # type: ignore
-                data.pop(i)  # type: ignore
-                break
-
-        JSON.save('notifys', data)
+        self.db.remove_notify(self.user_id, self.uuid)
 
         self.remove_notify.disabled = True
         await interaction.response.edit_message(view=self)
@@ -84,6 +79,49 @@ class NotifyView(discord.ui.View):
         await interaction.followup.send(removed_notify.format(skin=self.name), ephemeral=True)  # type: ignore
 
 
+class _NotifyRemoveButton(ui.Button):
+    def __init__(self, user_id: int, uuid: str, name: str) -> None:
+        self.user_id = user_id
+        self.uuid = uuid
+        self.name = name
+        super().__init__(label=name[:80], emoji='✖️', style=ButtonStyle.red)
+
+    async def callback(self, interaction: Interaction) -> None:
+        if interaction.user.id != int(self.user_id):
+            await interaction.response.send_message(
+                'This pagination menu cannot be controlled by you, sorry!', ephemeral=True
+            )
+            return
+
+        self.view.db.remove_notify(self.user_id, self.uuid)  # type: ignore[union-attr]
+
+        self.disabled = True
+        await interaction.response.edit_message(view=self.view)
+
+        removed_notify = self.view.response.get('REMOVED_NOTIFY')  # type: ignore[union-attr]
+        await interaction.followup.send(removed_notify.format(skin=self.name), ephemeral=True)
+
+
+class NotifyBatchView(ui.View):
+    """Remove buttons of a notify message shared by several users, each button usable by its own user"""
+
+    def __init__(self, db: DATABASE, skins: list[tuple[int, str, str]], response: dict[str, Any]) -> None:
+        self.db = db
+        self.response = response
+        self.message: discord.Message | None = None
+        super().__init__(timeout=600)
+        for user_id, uuid, name in skins:
+            self.add_item(_NotifyRemoveButton(user_id, uuid, name))
+
+    async def on_timeout(self) -> None:
+        """Called when the view times out"""
+
+        with contextlib.suppress(Exception):
+            for item in self.children:
+                item.disabled = True  # type: ignore[attr-defined]
+            await self.message.edit(view=self)  # type: ignore[union-attr]
+
+
 class _NotifyListButton(ui.Button):
     def __init__(self, label: str, custom_id: str) -> None:
         super().__init__(label=label, style=ButtonStyle.red, custom_id=str(custom_id))
@@ -91,13 +129,7 @@ class _NotifyListButton(ui.Button):
     async def callback(self, interaction: Interaction) -> None:
         await interaction.response.defer()
 
-        data: dict[str, Any] = JSON.read('notifys')
-        for i in range(len(data)):
-            if data[i]['uuid'] == self.custom_id and data[i]['id'] == str(self.view.interaction.user.id):  # type: ignore
-                data.pop(i)  # type: ignore
-                break
-
-        JSON.save('notifys', data)
+        self.view.db.remove_notify(self.view.interaction.user.id, self.custom_id)  # type: ignore[union-attr]
 
         del self.view.skin_source[self.custom_id]  # type: ignore
         self.view.update_button()  # type: ignore
@@ -108,8 +140,9 @@ class _NotifyListButton(ui.Button):
 class NotifyViewList(ui.View):
     skin_source: dict
 
-    def __init__(self, interaction: Interaction[ValorantBot], response: dict[str, Any]) -> None:
+    def __init__(self, interaction: Interaction[ValorantBot], db: DATABASE, response: dict[str, Any]) -> None:
         self.interaction: Interaction = interaction
+        self.db = db
         self.response = response
         self.bot: ValorantBot = interaction.client
         self.default_language = 'en-US'
@@ -140,8 +173,7 @@ class NotifyViewList(ui.View):
     def get_data(self) -> None:
         """Gets the data from the cache."""
 
-        database = JSON.read('notifys')
-        notify_skin = [x['uuid'] for x in database if x['id'] == str(self.interaction.user.id)]  # type: ignore
+        notify_skin = self.db.get_notify_list(self.interaction.user.id)
         skin_source = {}
 
         for uuid in notify_skin:
@@ -224,7 +256,7 @@ class TwoFA_UI(ui.Modal, title='Two-factor authentication'):
         if code:
             cookie = self.cookie
             user_id = self.interaction.user.id
-            auth = self.db.auth
+            auth = Auth()
             auth.locale_code = self.interaction.locale  # type: ignore
 
             async def send_embed(content: str) -> None: